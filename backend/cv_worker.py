@@ -0,0 +1,97 @@
+# Cross-validation folds for the training jobs, one spawned process per fold.
+# Kept free of the app imports so fold processes only load NumPy, scikit-learn and TensorFlow
+# (through training.py).
+import os
+
+import numpy as np
+
+
+def fold_scalers(X, folds):
+    # StandardScaler stats of every fold's training part from a single pass over X: each one is
+    # the full-data sums minus the held-out fold's sums (centred first to keep the variance stable)
+    center = X.mean(axis=0)
+    deltas = X - center
+    total, total_sq, n = deltas.sum(axis=0), np.square(deltas).sum(axis=0), len(X)
+    scalers = []
+    for test_idx in folds:
+        held_out = deltas[test_idx]
+        m = n - len(test_idx)
+        mean = (total - held_out.sum(axis=0)) / m
+        var = np.maximum((total_sq - np.square(held_out).sum(axis=0)) / m - mean ** 2, 0.0)
+        scale = np.sqrt(var)
+        # Constant columns are left unscaled, as StandardScaler does
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        scalers.append((center + mean, scale))
+    return scalers
+
+
+def run_fold(conn, data_path, test_idx, mean, scale, milestones, options, threads=0, family="ann", model_params=None):
+    # data_path: .npy of [X | y]; reports ("progress", epoch, logs) per epoch and finally
+    # ("done", {milestone: metrics}) or ("error", message). scikit-learn families have no epochs,
+    # so every milestone gets the same metrics.
+    try:
+        import tensorflow as tf
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        import training
+
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+        parent = os.getppid()
+
+        data = np.load(data_path, mmap_mode="r")
+        train = np.ones(len(data), dtype=bool)
+        train[test_idx] = False
+        X_train = (data[train, :-1] - mean) / scale
+        y_train = np.asarray(data[train, -1])
+        X_test = (data[test_idx, :-1] - mean) / scale
+        y_test = np.asarray(data[test_idx, -1])
+
+        pending = sorted(set(milestones))
+        results = {}
+
+        def evaluate(epochs, train_loss, epochs_run):
+            y_pred = training.predict(model, X_test)
+            finite = np.all(np.isfinite(y_pred))
+            results[epochs] = {
+                "train_loss": train_loss,
+                "mse": float(mean_squared_error(y_test, y_pred)) if finite else None,
+                "mae": float(mean_absolute_error(y_test, y_pred)) if finite else None,
+                "r2": float(r2_score(y_test, y_pred)) if finite else None,
+                "epochs_run": epochs_run,
+            }
+
+        if family != "ann":
+            model = training.build_estimator(family, model_params, n_jobs=threads or -1)
+            model.fit(X_train, y_train)
+            train_loss = float(mean_squared_error(y_train, model.predict(X_train)))
+            for epochs in pending:
+                evaluate(epochs, train_loss, None)
+            conn.send(("done", results))
+            return
+
+        model = training.build_model(X_train.shape[1], options["learning_rate"])
+
+        def on_epoch_end(epoch, logs):
+            conn.send(("progress", epoch + 1, {key: float(value) for key, value in logs.items()}))
+            if pending and pending[0] == epoch + 1:
+                evaluate(pending.pop(0), float(logs["loss"]), epoch + 1)
+            # Stop if the training worker that started us was killed (cancel or timeout)
+            if os.getppid() != parent:
+                model.stop_training = True
+
+        history, epochs_run, _ = training.fit_model(
+            model, X_train, y_train, options, max(milestones),
+            callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
+        )
+        # Milestones past an early stop are scored on the restored best weights
+        for epochs in pending:
+            evaluate(epochs, float(history.history["loss"][-1]), epochs_run)
+        conn.send(("done", results))
+    except Exception as e:
+        try:
+            conn.send(("error", str(e)))
+        except OSError:
+            pass  # the training worker is gone, nobody is waiting for this fold
+    finally:
+        conn.close()
@@ -0,0 +1,196 @@
+# Columnar dataset cache: each CSV is converted once into typed per-column binary files.
+# Kept free of the app imports so the training workers can read datasets without loading the API.
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from threading import Lock
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+DATASETS_FOLDER = Path("datasets")
+DATASET_CACHE_FOLDER = DATASETS_FOLDER / ".columns"
+DATASET_CHUNK_ROWS = 200000
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+dataset_cache_locks = {}
+dataset_cache_locks_guard = Lock()
+
+
+def file_signature(path):
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def detect_separator(header_line):
+    return ";" if header_line.count(";") >= header_line.count(",") else ","
+
+
+def dataset_cache_dir(dataset_path):
+    return DATASET_CACHE_FOLDER / Path(dataset_path).stem
+
+
+def dataset_cache_lock(dataset_path):
+    with dataset_cache_locks_guard:
+        return dataset_cache_locks.setdefault(Path(dataset_path).stem, Lock())
+
+
+def infer_column_kind(name, series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    sample = series.dropna().astype(str).head(200)
+    if len(sample) and ("time" in name or "date" in name or sample.str.match(r"^\d{4}-\d{2}-\d{2}").all()):
+        if pd.to_datetime(sample, errors="coerce").notna().all():
+            return "datetime"
+    if len(sample) and pd.to_numeric(sample, errors="coerce").notna().all():
+        return "numeric"
+    return "category"
+
+
+def encode_column(column, series):
+    if column["kind"] == "numeric":
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+    if column["kind"] == "datetime":
+        values = pd.to_datetime(series, errors="coerce")
+        if getattr(values.dt, "tz", None) is not None:
+            values = values.dt.tz_convert(None)
+        return values.astype("datetime64[ns]").to_numpy().view(np.int64)
+    known = column.setdefault("known", set(column["categories"]))
+    values = series.astype("string")
+    present = values.notna().to_numpy()
+    strings = values[present].to_numpy(dtype=object)
+    for value in pd.unique(strings):
+        if value not in known:
+            known.add(value)
+            column["categories"].append(value)
+    codes = np.full(len(series), -1, dtype=np.int32)
+    codes[present] = pd.Index(column["categories"]).get_indexer(strings)
+    return codes
+
+
+def write_dataset_chunks(target_dir, chunks, meta, on_chunk=None):
+    # Appends each chunk column-wise to <target_dir>/c<i>.bin, updating meta in place
+    for chunk in chunks:
+        chunk.columns = [str(col).strip().lower() for col in chunk.columns]
+        if not meta["columns"]:
+            meta["columns"] = [
+                {"name": name, "file": f"c{i}.bin", "kind": infer_column_kind(name, chunk[name]), "categories": []}
+                for i, name in enumerate(chunk.columns)
+            ]
+        for column in meta["columns"]:
+            series = chunk[column["name"]] if column["name"] in chunk.columns else pd.Series([None] * len(chunk))
+            with open(target_dir / column["file"], "ab") as f:
+                encode_column(column, series).tofile(f)
+        meta["rows"] += len(chunk)
+        if on_chunk is not None:
+            on_chunk(meta["rows"])
+    for column in meta["columns"]:
+        column.pop("known", None)
+    return meta
+
+
+def write_dataset_meta(target_dir, meta):
+    tmp_path = target_dir / "meta.json.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, target_dir / "meta.json")
+
+
+def hash_file(path, block_size=UPLOAD_CHUNK_BYTES):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_dataset_cache(dataset_path, sep=None, on_chunk=None, content_hash=None):
+    dataset_path = Path(dataset_path)
+    if sep is None:
+        with open(dataset_path, "r", encoding="utf-8-sig") as f:
+            sep = detect_separator(f.readline())
+
+    target_dir = dataset_cache_dir(dataset_path)
+    tmp_dir = target_dir.with_name(f"{target_dir.name}.{uuid4().hex}.tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        meta = {
+            "source": file_signature(dataset_path),
+            "content_hash": content_hash or hash_file(dataset_path),
+            "sep": sep,
+            "rows": 0,
+            "columns": [],
+        }
+        chunks = pd.read_csv(dataset_path, sep=sep, chunksize=DATASET_CHUNK_ROWS, encoding="utf-8-sig", on_bad_lines="skip")
+        write_dataset_chunks(tmp_dir, chunks, meta, on_chunk)
+        write_dataset_meta(tmp_dir, meta)
+        if target_dir.exists():
+            shutil.rmtree(target_dir)
+        os.replace(tmp_dir, target_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return meta
+
+
+def load_dataset_meta(dataset_path):
+    # Caller holds dataset_cache_lock
+    meta_path = dataset_cache_dir(dataset_path) / "meta.json"
+    if meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("source") == list(file_signature(dataset_path)) and meta.get("content_hash"):
+            return meta
+    return build_dataset_cache(dataset_path)
+
+
+def get_dataset_meta(dataset_path):
+    dataset_path = Path(dataset_path)
+    if not dataset_path.exists():
+        raise FileNotFoundError(f"Dataset not found: {dataset_path}")
+    with dataset_cache_lock(dataset_path):
+        return load_dataset_meta(dataset_path)
+
+
+def dataset_columns(dataset_path):
+    return [column["name"] for column in get_dataset_meta(dataset_path)["columns"]]
+
+
+def read_dataset(dataset_path, columns=None, nrows=None):
+    # Shared loader: lowercased columns, parsed timestamps, only the requested columns (and the
+    # first nrows rows) are read
+    meta = get_dataset_meta(dataset_path)
+    cache_dir = dataset_cache_dir(dataset_path)
+    wanted = meta["columns"] if columns is None else [c for c in meta["columns"] if c["name"] in set(columns)]
+    if columns is not None:
+        order = {name: i for i, name in enumerate(columns)}
+        wanted = sorted(wanted, key=lambda c: order[c["name"]])
+
+    data = {}
+    rows = meta["rows"] if nrows is None else min(meta["rows"], nrows)
+    for column in wanted:
+        path = cache_dir / column["file"]
+        if column["kind"] == "numeric":
+            data[column["name"]] = np.fromfile(path, dtype=np.float64, count=rows)
+        elif column["kind"] == "datetime":
+            # NaT is stored as the minimum int64, which is NumPy's own NaT encoding
+            data[column["name"]] = np.fromfile(path, dtype=np.int64, count=rows).view("datetime64[ns]")
+        else:
+            codes = np.fromfile(path, dtype=np.int32, count=rows)
+            data[column["name"]] = pd.Categorical.from_codes(codes, categories=column["categories"])
+    return pd.DataFrame(data, index=pd.RangeIndex(rows), columns=[c["name"] for c in wanted])
+
+
+def open_dataset_column(dataset_path, meta, column):
+    # Memory-mapped view over one cached column (the OS page cache keeps hot columns resident)
+    dtype = {"numeric": np.float64, "datetime": np.int64, "category": np.int32}[column["kind"]]
+    if not meta["rows"]:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(dataset_cache_dir(dataset_path) / column["file"], dtype=dtype, mode="r", shape=(meta["rows"],))
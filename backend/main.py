@@ -3,6 +3,7 @@ from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, Body, HTTP
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi import BackgroundTasks
 from fastapi import WebSocket, WebSocketDisconnect
 
@@ -17,9 +18,10 @@ import faiss
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.metrics import mean_absolute_error, r2_score
 from sentence_transformers import SentenceTransformer
 from threading import Lock
+from collections import OrderedDict
 
 # 📚 Utilities & system
 import os
@@ -28,27 +30,45 @@ import json
 import shutil
 import tempfile
 import zipfile
+import sqlite3
 import requests
 from datetime import datetime
 from pathlib import Path
 from langdetect import detect
-from typing import List
+from typing import List, Optional
 import json
-import uuid
 import time
-import matplotlib.pyplot as plt
 import io
 import base64
+import atexit
+import hashlib
 from uuid import uuid4
 import threading
+import logging
+import asyncio
+import codecs
+import csv
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import plot_worker
+import training
+import training_jobs
+from dataset_cache import (
+    DATASETS_FOLDER, DATASET_CACHE_FOLDER, UPLOAD_CHUNK_BYTES, detect_separator, dataset_cache_dir, dataset_cache_lock,
+    encode_column, write_dataset_chunks, write_dataset_meta, file_signature, build_dataset_cache, load_dataset_meta,
+    get_dataset_meta, read_dataset, open_dataset_column,
+)
+from model_io import MODEL_FOLDER, SUMMARY_FOLDER, NumpyDenseModel, SklearnModel, model_file, save_model_file, export_numpy_artifact
+from training_jobs import (
+    CV_MAX_FOLDS, MODEL_VERSIONS_FOLDER, AUTOML_SEARCH_BUDGET, parse_search_space, unpack_candidate, candidate_nbytes,
+)
 from typing import Dict
 from dotenv import load_dotenv
 
 ENV_PATH = Path(".env")
 CONFIG_PATH = Path(".config")
-DATASETS_FOLDER = Path("datasets")
-MODEL_FOLDER = Path("models")
-SUMMARY_FOLDER = Path("summaries")
 
 CONFIG_FILE = Path("config.json")
 STATISTICS_FILE = Path("statistics.json")
@@ -68,8 +88,6 @@ app.add_middleware(
 )
 #app = FastAPI(root_path="/pulse/api")
 
-task_status = {} 
-
 # Websocket to get the traning model status
 
 
@@ -77,21 +95,8 @@ active_connections: Dict[str, WebSocket] = {}
 
 @app.websocket("/ws/train/{task_id}")
 async def websocket_endpoint(websocket: WebSocket, task_id: str):
-    await websocket.accept()
-    active_connections[task_id] = websocket
-    try:
-        while True:
-            await websocket.receive_text()  # Mantener la conexión abierta
-    except WebSocketDisconnect:
-        del active_connections[task_id]
-
+    await forward_job_events(websocket, task_id)
 
-        
-def get_model(model_name):
-    if model_name not in loaded_models:
-        model_path = Path(MODEL_FOLDER, f'{model_name}.h5')
-        loaded_models[model_name] = tf.keras.models.load_model(model_path)
-    return loaded_models[model_name]
 
 # Create default .config if not exists
 os.makedirs(CONFIG_PATH, exist_ok=True)
@@ -119,7 +124,291 @@ def login(username: str = Form(...), password: str = Form(...)):
 # PREDICTIONS
 stored_data = {}
 model_lock = Lock()
-loaded_models = {}
+BATCH_PREDICT_CHUNK = 8192
+
+# NumPy inference engine for the generated Dense networks
+NUMPY_ENGINE_ENABLED = os.getenv("NUMPY_ENGINE", "1") == "1"
+
+# Model artifact cache (model + scaler + summary per model name)
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "8"))
+MODEL_CACHE_MAX_MB = float(os.getenv("MODEL_CACHE_MAX_MB", "512"))
+
+class ModelArtifacts:
+    def __init__(self, model_name, model_path, model, engine, scaler, summary, model_signature, summary_signature, size_bytes):
+        self.model_name = model_name
+        self.model_path = model_path
+        self._model = model
+        self.engine = engine
+        self.scaler = scaler
+        self.summary = summary
+        self.features = (summary or {}).get("features")
+        self.model_signature = model_signature
+        self.summary_signature = summary_signature
+        self.size_bytes = size_bytes
+
+    @property
+    def model(self):
+        # Keras model is only loaded when needed (no NumPy engine, or explicit Keras access)
+        if isinstance(self.engine, SklearnModel):
+            return self.engine.estimator
+        if self._model is None:
+            with model_lock:
+                if self._model is None:
+                    self._model = tf.keras.models.load_model(self.model_path)
+        return self._model
+
+    def predict(self, X):
+        if self.engine is not None:
+            return self.engine.predict(X)
+        X_scaled = self.scaler.transform(X)
+        model = self.model
+        with model_lock:
+            y_pred = model.predict(X_scaled, batch_size=min(len(X_scaled), BATCH_PREDICT_CHUNK), verbose=0)
+        return y_pred.reshape(-1)
+
+class ModelArtifactCache:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def paths(model_name):
+        return (
+            model_file(MODEL_FOLDER, model_name),
+            Path(MODEL_FOLDER, f'{model_name}_scaler.gz'),
+            Path(SUMMARY_FOLDER, f"{model_name}.json"),
+            Path(MODEL_FOLDER, f'{model_name}_numpy.npz'),
+        )
+
+    @staticmethod
+    def _model_signature(model_path, scaler_path, engine_path):
+        return (file_signature(model_path), file_signature(scaler_path), file_signature(engine_path))
+
+    def get(self, model_name):
+        model_path, scaler_path, summary_path, engine_path = self.paths(model_name)
+        model_signature = self._model_signature(model_path, scaler_path, engine_path)
+        if None in model_signature[:2]:
+            self.invalidate(model_name)
+            raise FileNotFoundError(f"Model not trained yet: {model_name}")
+        summary_signature = file_signature(summary_path)
+
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None and entry.model_signature == model_signature:
+                self._entries.move_to_end(model_name)
+                self.hits += 1
+                if entry.summary_signature == summary_signature:
+                    return entry
+            elif entry is not None:
+                del self._entries[model_name]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            load_lock = self._load_locks.setdefault(model_name, Lock())
+
+        with load_lock:
+            if entry is not None:
+                # Only the summary changed (e.g. a saved simulation): keep model and scaler
+                entry.summary = self._read_summary(summary_path)
+                entry.features = (entry.summary or {}).get("features")
+                entry.summary_signature = summary_signature
+                return entry
+
+            with self._lock:
+                cached = self._entries.get(model_name)
+                if cached is not None and cached.model_signature == model_signature:
+                    return cached
+
+            scaler = joblib.load(scaler_path)
+            model, engine = None, None
+            if model_path.suffix == ".joblib":
+                engine = SklearnModel(scaler, joblib.load(model_path), model_signature[0][1])
+            elif NUMPY_ENGINE_ENABLED:
+                engine_signature = model_signature[2]
+                if engine_signature is None or engine_signature[0] < model_signature[0][0]:
+                    # Missing or stale artifact: export it once from the Keras model
+                    with model_lock:
+                        model = tf.keras.models.load_model(model_path)
+                        export_numpy_artifact(model, scaler, engine_path)
+                    model_signature = self._model_signature(model_path, scaler_path, engine_path)
+                if model_signature[2] is not None and model_signature[2][0] >= model_signature[0][0]:
+                    engine = NumpyDenseModel.load(engine_path)
+            if engine is None and model is None:
+                model = tf.keras.models.load_model(model_path)
+
+            size_bytes = model_signature[0][1] + model_signature[1][1] + (summary_signature[1] if summary_signature else 0)
+            if engine is not None:
+                size_bytes = engine.nbytes + (summary_signature[1] if summary_signature else 0)
+                model = None
+
+            entry = ModelArtifacts(
+                model_name,
+                model_path,
+                model,
+                engine,
+                scaler,
+                self._read_summary(summary_path),
+                model_signature,
+                summary_signature,
+                size_bytes,
+            )
+
+        with self._lock:
+            self._entries[model_name] = entry
+            self._entries.move_to_end(model_name)
+            self._evict()
+        return entry
+
+    @staticmethod
+    def _read_summary(summary_path):
+        if not summary_path.exists():
+            return None
+        with open(summary_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _evict(self):
+        total = sum(e.size_bytes for e in self._entries.values())
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.size_bytes
+            self.evictions += 1
+
+    def invalidate(self, model_name):
+        with self._lock:
+            if self._entries.pop(model_name, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            requests_total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "size_mb": round(sum(e.size_bytes for e in self._entries.values()) / 1024 ** 2, 3),
+                "max_mb": round(self.max_bytes / 1024 ** 2, 3),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests_total, 4) if requests_total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "models": list(self._entries.keys()),
+            }
+
+model_cache = ModelArtifactCache(MODEL_CACHE_MAX_ENTRIES, int(MODEL_CACHE_MAX_MB * 1024 ** 2))
+
+def get_model(model_name):
+    return model_cache.get(model_name).model
+
+# Micro-batching of concurrent single-row predictions
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "2"))
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "256"))
+INFERENCE_WORKER_IDLE_SECONDS = 60
+
+class InferenceBatcher:
+    # One worker thread per model collects requests for up to window_ms / max_batch rows
+    # and scores them with a single forward pass
+    def __init__(self, window_ms, max_batch):
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queues = {}
+        self._lock = Lock()
+        self.submitted = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_batch > 1
+
+    def predict(self, artifacts, values):
+        row = np.asarray(values, dtype=np.float64)
+        if not self.enabled:
+            return float(artifacts.predict(row.reshape(1, -1))[0])
+
+        future = Future()
+        with self._lock:
+            q = self._queues.get(artifacts.model_name)
+            if q is None:
+                q = queue.Queue()
+                self._queues[artifacts.model_name] = q
+                threading.Thread(target=self._worker, args=(artifacts.model_name, q), daemon=True).start()
+            q.put((artifacts, row, future, time.perf_counter()))
+            self.submitted += 1
+        return future.result()
+
+    def _worker(self, model_name, q):
+        while True:
+            try:
+                first = q.get(timeout=INFERENCE_WORKER_IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    if q.empty():
+                        del self._queues[model_name]
+                        return
+                continue
+
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        started = time.perf_counter()
+        # Requests that raced with a model reload carry different artifacts; score each group separately
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+        for items in groups.values():
+            try:
+                X = np.vstack([row for _, row, _, _ in items])
+                y_pred = items[0][0].predict(X)
+                for (_, _, future, _), value in zip(items, y_pred):
+                    future.set_result(float(value))
+            except Exception as e:
+                for _, _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+        with self._lock:
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.total_wait += sum(started - enqueued for _, _, _, enqueued in batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch,
+                "queue_depth": {name: q.qsize() for name, q in self._queues.items()},
+                "submitted": self.submitted,
+                "batches": self.batches,
+                "avg_batch_size": round(self.submitted / self.batches, 3) if self.batches else 0.0,
+                "max_batch_seen": self.max_batch_seen,
+                "avg_queue_wait_ms": round(self.total_wait / self.submitted * 1000.0, 3) if self.submitted else 0.0,
+            }
+
+inference_batcher = InferenceBatcher(INFERENCE_BATCH_WINDOW_MS, INFERENCE_BATCH_MAX_SIZE)
 
 class FeatureSelection(BaseModel):
     features: list[str]
@@ -129,44 +418,613 @@ class FeatureSelection(BaseModel):
 class PredictionInput(BaseModel):
     values: dict
 
+# Columnar dataset cache (dataset_cache.py)
+def drop_dataset_cache(dataset_path):
+    forget_dataset_profile(dataset_path)
+    remember_example_pool(dataset_path, None)
+    cache_dir = dataset_cache_dir(dataset_path)
+    if cache_dir.exists():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+# Dataset profile: describe, correlations, null counts and histograms computed once per
+# dataset version (content hash) and stored as profile.json next to the columnar cache
+PROFILE_HISTOGRAM_BINS = 30
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+PROFILE_CHUNK_ROWS = 50000
+MOMENT_KEYS = ("n", "mean_x", "mean_y", "m2_x", "m2_y", "c")
+dataset_profiles = {}
+dataset_profiles_lock = Lock()
+
+def pairwise_moments(X):
+    # Pairwise-complete moments for every column pair (i, j), so the correlation matrix
+    # matches pandas' corr() and chunks can be merged without rescanning
+    valid = ~np.isnan(X)
+    Z = np.where(valid, X, 0.0)
+    k = X.shape[1]
+    moments = {key: np.zeros((k, k)) for key in MOMENT_KEYS}
+    for i in range(k):
+        mask = valid[:, [i]] & valid
+        n = mask.sum(axis=0)
+        safe_n = np.maximum(n, 1)
+        xi = np.where(mask, Z[:, [i]], 0.0)
+        xj = np.where(mask, Z, 0.0)
+        mean_x = xi.sum(axis=0) / safe_n
+        mean_y = xj.sum(axis=0) / safe_n
+        dx = np.where(mask, Z[:, [i]] - mean_x, 0.0)
+        dy = np.where(mask, Z - mean_y, 0.0)
+        moments["n"][i] = n
+        moments["mean_x"][i] = mean_x
+        moments["mean_y"][i] = mean_y
+        moments["m2_x"][i] = (dx * dx).sum(axis=0)
+        moments["m2_y"][i] = (dy * dy).sum(axis=0)
+        moments["c"][i] = (dx * dy).sum(axis=0)
+    return moments
+
+def merge_moments(a, b):
+    # Chan et al. parallel update, element-wise over the pair matrices
+    n = a["n"] + b["n"]
+    safe_n = np.maximum(n, 1)
+    dx = b["mean_x"] - a["mean_x"]
+    dy = b["mean_y"] - a["mean_y"]
+    weight = a["n"] * b["n"] / safe_n
+    return {
+        "n": n,
+        "mean_x": a["mean_x"] + dx * b["n"] / safe_n,
+        "mean_y": a["mean_y"] + dy * b["n"] / safe_n,
+        "m2_x": a["m2_x"] + b["m2_x"] + dx * dx * weight,
+        "m2_y": a["m2_y"] + b["m2_y"] + dy * dy * weight,
+        "c": a["c"] + b["c"] + dx * dy * weight,
+    }
+
+def correlation_from_moments(moments):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = moments["c"] / np.sqrt(moments["m2_x"] * moments["m2_y"])
+    corr[moments["n"] < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def finite_or_none(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+def summarize_profile(profile):
+    # Derives the per-column describe block and the correlation matrix from the stored moments
+    names = profile["numeric"]
+    moments = {key: np.asarray(profile["moments"][key], dtype=np.float64).reshape(len(names), len(names)) for key in MOMENT_KEYS}
+    corr = correlation_from_moments(moments)
+    profile["correlation"] = {
+        a: {b: finite_or_none(corr[i, j]) for j, b in enumerate(names)} for i, a in enumerate(names)
+    }
+    for column in profile["columns"].values():
+        if column["kind"] == "category":
+            counts = column["counts"]
+            column["count"] = sum(counts.values())
+            column["unique"] = len(counts)
+            column["top"] = dict(sorted(counts.items(), key=lambda item: -item[1])[:10])
+    for i, name in enumerate(names):
+        column = profile["columns"][name]
+        count = int(moments["n"][i, i])
+        column["count"] = count
+        column["mean"] = finite_or_none(moments["mean_x"][i, i]) if count else None
+        column["std"] = finite_or_none(np.sqrt(moments["m2_x"][i, i] / (count - 1))) if count > 1 else None
+    return profile
+
+def compute_dataset_profile(dataset_path, meta):
+    cache_dir = dataset_cache_dir(dataset_path)
+    rows = meta["rows"]
+    numeric = [c for c in meta["columns"] if c["kind"] == "numeric"]
+    profile = {
+        "content_hash": meta["content_hash"],
+        "rows": rows,
+        "numeric": [c["name"] for c in numeric],
+        "columns": {},
+    }
+
+    moments = None
+    arrays = [np.memmap(cache_dir / c["file"], dtype=np.float64, mode="r", shape=(rows,)) if rows else np.empty(0) for c in numeric]
+    for start in range(0, rows, PROFILE_CHUNK_ROWS):
+        X = np.column_stack([a[start:start + PROFILE_CHUNK_ROWS] for a in arrays]) if arrays else np.empty((0, 0))
+        chunk_moments = pairwise_moments(X)
+        moments = chunk_moments if moments is None else merge_moments(moments, chunk_moments)
+    if moments is None:
+        moments = pairwise_moments(np.empty((0, len(numeric))))
+    profile["moments"] = {key: moments[key].ravel().tolist() for key in MOMENT_KEYS}
+
+    for column, values in zip(numeric, arrays):
+        values = np.asarray(values)
+        finite = values[np.isfinite(values)]
+        entry = {"kind": "numeric", "nulls": int(rows - len(finite))}
+        if len(finite):
+            entry["min"] = float(finite.min())
+            entry["max"] = float(finite.max())
+            quantiles = np.quantile(finite, PROFILE_QUANTILES)
+            entry["quantiles"] = {f"{int(q * 100)}%": float(v) for q, v in zip(PROFILE_QUANTILES, quantiles)}
+            counts, edges = np.histogram(finite, bins=PROFILE_HISTOGRAM_BINS)
+            entry["histogram"] = {"edges": edges.tolist(), "counts": counts.tolist()}
+        profile["columns"][column["name"]] = entry
+
+    for column in meta["columns"]:
+        if column["kind"] == "datetime":
+            values = np.fromfile(cache_dir / column["file"], dtype=np.int64, count=rows)
+            present = values[values != np.iinfo(np.int64).min]
+            entry = {"kind": "datetime", "nulls": int(rows - len(present)), "count": int(len(present))}
+            if len(present):
+                entry["min"] = str(np.datetime64(int(present.min()), "ns"))
+                entry["max"] = str(np.datetime64(int(present.max()), "ns"))
+            profile["columns"][column["name"]] = entry
+        elif column["kind"] == "category":
+            codes = np.fromfile(cache_dir / column["file"], dtype=np.int32, count=rows)
+            counts = np.bincount(codes[codes >= 0], minlength=len(column["categories"]))
+            profile["columns"][column["name"]] = {
+                "kind": "category",
+                "nulls": int((codes < 0).sum()),
+                "counts": {column["categories"][i]: int(n) for i, n in enumerate(counts) if n},
+            }
+    profile["columns"] = {c["name"]: profile["columns"][c["name"]] for c in meta["columns"]}
+    return summarize_profile(profile)
+
+def write_dataset_profile(dataset_path, profile):
+    cache_dir = dataset_cache_dir(dataset_path)
+    stored = {key: value for key, value in profile.items() if key != "correlation"}
+    tmp_path = cache_dir / f"profile.json.{uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stored, f)
+    os.replace(tmp_path, cache_dir / "profile.json")
+
+def load_stored_profile(dataset_path, content_hash):
+    profile_path = dataset_cache_dir(dataset_path) / "profile.json"
+    if not profile_path.exists():
+        return None
+    with open(profile_path) as f:
+        profile = json.load(f)
+    if profile.get("content_hash") != content_hash:
+        return None
+    return summarize_profile(profile)
+
+def remember_dataset_profile(dataset_path, profile):
+    stem = Path(dataset_path).stem
+    with dataset_profiles_lock:
+        for stale in [k for k in dataset_profiles if k[0] == stem]:
+            del dataset_profiles[stale]
+        dataset_profiles[(stem, profile["content_hash"])] = profile
+
+def get_dataset_profile(dataset_path):
+    dataset_path = Path(dataset_path)
+    meta = get_dataset_meta(dataset_path)
+    with dataset_profiles_lock:
+        profile = dataset_profiles.get((dataset_path.stem, meta["content_hash"]))
+    if profile is not None:
+        return profile
+
+    with dataset_cache_lock(dataset_path):
+        meta = load_dataset_meta(dataset_path)
+        profile = load_stored_profile(dataset_path, meta["content_hash"])
+        if profile is None:
+            profile = compute_dataset_profile(dataset_path, meta)
+            write_dataset_profile(dataset_path, profile)
+
+    remember_dataset_profile(dataset_path, profile)
+    return profile
+
+def extend_histogram(hist, values):
+    # Adds values to fixed-width bins, growing the range with extra bins of the same width
+    # and halving the resolution once there are more than twice the default bin count
+    if not hist:
+        counts, edges = np.histogram(values, bins=PROFILE_HISTOGRAM_BINS)
+        return {"edges": edges.tolist(), "counts": counts.tolist()}
+    edges = np.asarray(hist["edges"], dtype=np.float64)
+    counts = np.asarray(hist["counts"], dtype=np.int64)
+    width = edges[1] - edges[0]
+    below = int(np.ceil((edges[0] - values.min()) / width)) if values.min() < edges[0] else 0
+    above = int(np.ceil((values.max() - edges[-1]) / width)) if values.max() > edges[-1] else 0
+    if below or above:
+        counts = np.concatenate([np.zeros(below, np.int64), counts, np.zeros(above, np.int64)])
+        edges = edges[0] - below * width + width * np.arange(len(counts) + 1)
+    counts += np.histogram(values, bins=edges)[0]
+    while len(counts) > 2 * PROFILE_HISTOGRAM_BINS:
+        if len(counts) % 2:
+            counts = np.append(counts, 0)
+            edges = np.append(edges, edges[-1] + width)
+        counts = counts.reshape(-1, 2).sum(axis=1)
+        edges = edges[::2]
+        width *= 2
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+def histogram_quantiles(hist):
+    counts = np.asarray(hist["counts"], dtype=np.float64)
+    cumulative = np.concatenate([[0.0], np.cumsum(counts)])
+    targets = np.asarray(PROFILE_QUANTILES) * cumulative[-1]
+    return {f"{int(q * 100)}%": float(v) for q, v in zip(PROFILE_QUANTILES, np.interp(targets, cumulative, hist["edges"]))}
+
+def update_dataset_profile(profile, meta, batch):
+    # Folds an appended batch ({column: encoded values}) into the profile; moments stay exact,
+    # quantiles become histogram estimates
+    names = profile["numeric"]
+    if names:
+        k = len(names)
+        stored = {key: np.asarray(profile["moments"][key], dtype=np.float64).reshape(k, k) for key in MOMENT_KEYS}
+        merged = merge_moments(stored, pairwise_moments(np.column_stack([batch[name] for name in names])))
+        profile["moments"] = {key: merged[key].ravel().tolist() for key in MOMENT_KEYS}
+
+    for column in meta["columns"]:
+        entry = profile["columns"][column["name"]]
+        values = batch[column["name"]]
+        if column["kind"] == "numeric":
+            finite = values[np.isfinite(values)]
+            entry["nulls"] += int(len(values) - len(finite))
+            if len(finite):
+                entry["min"] = min(entry.get("min", np.inf), float(finite.min()))
+                entry["max"] = max(entry.get("max", -np.inf), float(finite.max()))
+                entry["histogram"] = extend_histogram(entry.get("histogram"), finite)
+                entry["quantiles"] = histogram_quantiles(entry["histogram"])
+                entry["quantiles_approximate"] = True
+        elif column["kind"] == "datetime":
+            present = values[values != np.iinfo(np.int64).min]
+            entry["nulls"] += int(len(values) - len(present))
+            entry["count"] += int(len(present))
+            if len(present):
+                bounds = [np.datetime64(entry[key], "ns").astype(np.int64) for key in ("min", "max") if key in entry]
+                entry["min"] = str(np.datetime64(int(min([present.min()] + bounds[:1])), "ns"))
+                entry["max"] = str(np.datetime64(int(max([present.max()] + bounds[1:])), "ns"))
+        else:
+            entry["nulls"] += int((values < 0).sum())
+            codes, counts = np.unique(values[values >= 0], return_counts=True)
+            for code, n in zip(codes, counts):
+                name = column["categories"][code]
+                entry["counts"][name] = entry["counts"].get(name, 0) + int(n)
+
+    profile["rows"] = meta["rows"]
+    profile["content_hash"] = meta["content_hash"]
+    return summarize_profile(profile)
+
+def profile_describe(profile, columns=None):
+    # Same shape as DataFrame.describe().to_dict() for the numeric columns
+    names = [c for c in (columns or profile["numeric"]) if c in profile["numeric"]]
+    summary = {}
+    for name in names:
+        column = profile["columns"][name]
+        quantiles = column.get("quantiles", {})
+        summary[name] = {
+            "count": float(column["count"]),
+            "mean": column["mean"],
+            "std": column["std"],
+            "min": column.get("min"),
+            **{label: quantiles.get(label) for label in ("25%", "50%", "75%")},
+            "max": column.get("max"),
+        }
+    return summary
+
+def forget_dataset_profile(dataset_path):
+    with dataset_profiles_lock:
+        for stale in [k for k in dataset_profiles if k[0] == Path(dataset_path).stem]:
+            del dataset_profiles[stale]
+
+# Example pool: a uniform reservoir of rows with a valid PUE per dataset version, so
+# /example_input answers from memory instead of scanning the dataset
+EXAMPLE_POOL_SIZE = 1024
+EXAMPLE_MAX_COUNT = 100
+example_pools = {}
+example_pools_lock = Lock()
+
+def example_pool_path(dataset_path):
+    return dataset_cache_dir(dataset_path) / "examples.npz"
+
+def build_example_pool(dataset_path, meta):
+    numeric = [c for c in meta["columns"] if c["kind"] == "numeric"]
+    names = [c["name"] for c in numeric]
+    if "pue" in names:
+        candidates = np.flatnonzero(np.isfinite(open_dataset_column(dataset_path, meta, numeric[names.index("pue")])))
+    else:
+        candidates = np.arange(meta["rows"])
+    chosen = np.sort(np.random.default_rng().choice(candidates, min(EXAMPLE_POOL_SIZE, len(candidates)), replace=False))
+    values = np.empty((len(chosen), len(names)))
+    for i, column in enumerate(numeric):
+        values[:, i] = open_dataset_column(dataset_path, meta, column)[chosen]
+    return {"content_hash": meta["content_hash"], "columns": names, "values": values, "seen": int(len(candidates))}
+
+def update_example_pool(pool, meta, batch):
+    # Reservoir sampling (Algorithm R) over the appended rows
+    values = np.column_stack([batch[name] for name in pool["columns"]]) if pool["columns"] else np.empty((len(batch["pue"]), 0))
+    if "pue" in batch:
+        values = values[np.isfinite(batch["pue"])]
+    current, seen = pool["values"], pool["seen"]
+    fill = min(EXAMPLE_POOL_SIZE - len(current), len(values))
+    if fill > 0:
+        current = np.vstack([current, values[:fill]])
+    rest = values[max(fill, 0):]
+    slots = np.random.default_rng().integers(0, seen + max(fill, 0) + np.arange(1, len(rest) + 1))
+    for row, slot in zip(rest[slots < EXAMPLE_POOL_SIZE], slots[slots < EXAMPLE_POOL_SIZE]):
+        current[slot] = row
+    pool.update({"content_hash": meta["content_hash"], "values": current, "seen": seen + len(values)})
+    return pool
+
+def write_example_pool(dataset_path, pool):
+    path = example_pool_path(dataset_path)
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, values=pool["values"], columns=np.array(pool["columns"], dtype=str),
+                 seen=pool["seen"], content_hash=pool["content_hash"])
+    os.replace(tmp_path, path)
+
+def load_example_pool(dataset_path, content_hash):
+    path = example_pool_path(dataset_path)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        if str(data["content_hash"]) != content_hash:
+            return None
+        return {"content_hash": content_hash, "columns": data["columns"].tolist(),
+                "values": data["values"], "seen": int(data["seen"])}
+
+def remember_example_pool(dataset_path, pool):
+    with example_pools_lock:
+        if pool is None:
+            example_pools.pop(Path(dataset_path).stem, None)
+        else:
+            example_pools[Path(dataset_path).stem] = pool
+
+def get_example_pool(dataset_path):
+    dataset_path = Path(dataset_path)
+    meta = get_dataset_meta(dataset_path)
+    with example_pools_lock:
+        pool = example_pools.get(dataset_path.stem)
+    if pool is not None and pool["content_hash"] == meta["content_hash"]:
+        return pool
+
+    with dataset_cache_lock(dataset_path):
+        meta = load_dataset_meta(dataset_path)
+        pool = load_example_pool(dataset_path, meta["content_hash"])
+        if pool is None:
+            pool = build_example_pool(dataset_path, meta)
+            write_example_pool(dataset_path, pool)
+    remember_example_pool(dataset_path, pool)
+    return pool
+
+# Streaming CSV upload
+
+class CsvUploadValidator:
+    # Parses the upload as it arrives: header + delimiter detection, per-row validation
+    # and running (Welford) statistics for the numeric columns. feed() returns the accepted rows.
+    def __init__(self):
+        self.sep = None
+        self.header = None
+        self.columns = None
+        self.rows = 0
+        self.invalid_rows = 0
+        self.invalid_samples = []
+        self.numeric = {}
+        self.stats = {}
+        self._pending = ""
+        self._line_no = 0
+
+    def feed(self, text, final=False):
+        data = self._pending + text
+        lines = data.split("\n")
+        self._pending = "" if final else lines.pop()
+        lines = [line.rstrip("\r") for line in lines]
+
+        if self.columns is None:
+            while lines and not lines[0].strip():
+                lines.pop(0)
+                self._line_no += 1
+            if not lines:
+                return None
+            header = lines.pop(0)
+            self._line_no += 1
+            self.sep = detect_separator(header)
+            self.header = next(csv.reader([header], delimiter=self.sep))
+            self.columns = [str(col).strip().lower() for col in self.header]
+            if "pue" not in self.columns:
+                raise ValueError("'pue' column not found in uploaded data.")
+            self.numeric = {col: True for col in self.columns}
+            self.stats = {col: {"count": 0, "nulls": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None} for col in self.columns}
+
+        valid, line_numbers = [], []
+        for fields in csv.reader(lines, delimiter=self.sep):
+            self._line_no += 1
+            if not fields or (len(fields) == 1 and not fields[0].strip()):
+                continue
+            if len(fields) != len(self.columns):
+                self._reject(f"expected {len(self.columns)} fields, got {len(fields)}")
+                continue
+            valid.append(fields)
+            line_numbers.append(self._line_no)
+        if not valid:
+            return pd.DataFrame(columns=self.columns, dtype=object)
+        return self._update(valid, line_numbers)
+
+    def _reject(self, reason, line=None):
+        self.invalid_rows += 1
+        if len(self.invalid_samples) < 20:
+            self.invalid_samples.append({"line": line or self._line_no, "reason": reason})
+
+    def _update(self, rows, line_numbers):
+        table = np.array(rows, dtype=object)
+        pue = pd.to_numeric(pd.Series(table[:, self.columns.index("pue")]), errors="coerce").to_numpy()
+        bad_pue = ~np.isfinite(pue)
+        if bad_pue.any():
+            for line in np.asarray(line_numbers)[bad_pue]:
+                self._reject("missing or non-numeric 'pue'", int(line))
+            table = table[~bad_pue]
+        self.rows += len(table)
+
+        for i, col in enumerate(self.columns):
+            raw = pd.Series(table[:, i]).str.strip().replace("", None)
+            stat = self.stats[col]
+            nulls = raw.isna()
+            stat["nulls"] += int(nulls.sum())
+            if not self.numeric[col]:
+                continue
+            values = pd.to_numeric(raw[~nulls], errors="coerce").to_numpy(dtype=np.float64)
+            if np.isnan(values).any():
+                self.numeric[col] = False
+                continue
+            if not len(values):
+                continue
+            n_b, mean_b = len(values), float(values.mean())
+            m2_b = float(((values - mean_b) ** 2).sum())
+            n_a = stat["count"]
+            n = n_a + n_b
+            delta = mean_b - stat["mean"]
+            stat["mean"] += delta * n_b / n
+            stat["m2"] += m2_b + delta * delta * n_a * n_b / n
+            stat["count"] = n
+            stat["min"] = float(values.min()) if stat["min"] is None else min(stat["min"], float(values.min()))
+            stat["max"] = float(values.max()) if stat["max"] is None else max(stat["max"], float(values.max()))
+        return pd.DataFrame(table, columns=self.columns, dtype=object).apply(lambda col: col.str.strip())
+
+    def column_stats(self):
+        result = {}
+        for col in self.columns or []:
+            stat = self.stats[col]
+            if self.numeric[col] and stat["count"]:
+                result[col] = {
+                    "kind": "numeric",
+                    "count": stat["count"],
+                    "nulls": stat["nulls"],
+                    "mean": stat["mean"],
+                    "std": float(np.sqrt(stat["m2"] / (stat["count"] - 1))) if stat["count"] > 1 else 0.0,
+                    "min": stat["min"],
+                    "max": stat["max"],
+                }
+            else:
+                result[col] = {"kind": "text", "nulls": stat["nulls"]}
+        return result
+
+async def send_progress(connection_id, payload):
+    if connection_id and connection_id in active_connections:
+        try:
+            await active_connections[connection_id].send_json(payload)
+        except Exception:
+            pass
+
+@app.websocket("/ws/upload/{upload_id}")
+async def websocket_upload(websocket: WebSocket, upload_id: str):
+    await websocket.accept()
+    active_connections[upload_id] = websocket
+    try:
+        while True:
+            await websocket.receive_text()  # keep the connection alive
+    except WebSocketDisconnect:
+        del active_connections[upload_id]
+
 @app.post("/pulse/generator/upload_data", tags=["PUEModelGenerator"])
-async def upload_data(model_name: str = Form(...), file: UploadFile = File(...)):
-    file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
-    with open(file_location, "wb") as f:
-        f.write(await file.read())
+async def upload_data(model_name: str = Form(...), file: UploadFile = File(...), upload_id: str = Form(None)):
+    # One pass over the upload: rows are validated as they arrive and only the accepted ones are
+    # written, to the CSV and to a fresh column cache, both swapped in once the upload is complete
+    file_location = Path(os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv")))
+    part_location = Path(f"{file_location}.part")
+    target_dir = dataset_cache_dir(file_location)
+    tmp_dir = target_dir.with_name(f"{target_dir.name}.{uuid4().hex}.tmp")
+    validator = CsvUploadValidator()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    digest = hashlib.sha1()
+    meta = {"source": None, "content_hash": None, "sep": None, "rows": 0, "columns": []}
+    received = 0
+
+    def consume(f, text, final=False):
+        rows = validator.feed(text, final)
+        if rows is None:
+            return
+        out = io.StringIO()
+        writer = csv.writer(out, delimiter=validator.sep, lineterminator="\n")
+        if not f.tell():
+            writer.writerow(validator.header)
+        writer.writerows(rows.itertuples(index=False))
+        payload = out.getvalue().encode("utf-8")
+        f.write(payload)
+        digest.update(payload)
+        if len(rows):
+            # Empty fields are nulls in the column files
+            write_dataset_chunks(tmp_dir, [rows.where(rows != "", None)], meta)
+
+    def finish():
+        if not meta["columns"]:
+            # No accepted rows: the columns still exist, just empty
+            write_dataset_chunks(tmp_dir, [pd.DataFrame(columns=validator.columns, dtype=object)], meta)
+        meta["sep"] = validator.sep
+        meta["content_hash"] = digest.hexdigest()
+        with dataset_cache_lock(file_location):
+            os.replace(part_location, file_location)
+            meta["source"] = file_signature(file_location)
+            write_dataset_meta(tmp_dir, meta)
+            if target_dir.exists():
+                shutil.rmtree(target_dir)
+            os.replace(tmp_dir, target_dir)
+            pool = build_example_pool(file_location, meta)
+            write_example_pool(file_location, pool)
+        remember_example_pool(file_location, pool)
 
-    df = pd.read_csv(file_location, sep=';')
-    df.columns = [col.lower() for col in df.columns]
-        
-    return {"message": "File uploaded successfully", "columns": df.columns.tolist()}
+    try:
+        tmp_dir.mkdir(parents=True)
+        with open(part_location, "wb") as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                received += len(chunk)
+                await run_in_threadpool(consume, f, decoder.decode(chunk))
+                await send_progress(upload_id, {
+                    "stage": "upload",
+                    "bytes": received,
+                    "total_bytes": file.size,
+                    "rows": validator.rows,
+                    "invalid_rows": validator.invalid_rows,
+                })
+            await run_in_threadpool(consume, f, decoder.decode(b"", final=True), True)
+        if validator.columns is None:
+            raise ValueError("Uploaded file is empty.")
+        await run_in_threadpool(finish)
+    except ValueError as e:
+        await send_progress(upload_id, {"stage": "error", "error": str(e)})
+        return {"error": str(e)}
+    finally:
+        # Nothing is left behind by a rejected, failed or abandoned upload
+        part_location.unlink(missing_ok=True)
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    await send_progress(upload_id, {"stage": "done", "rows": meta["rows"]})
+
+    return {
+        "message": "File uploaded successfully",
+        "columns": [c["name"] for c in meta["columns"]],
+        "rows": meta["rows"],
+        "valid_rows": validator.rows,
+        "delimiter": validator.sep,
+        "invalid_rows": validator.invalid_rows,
+        "invalid_samples": validator.invalid_samples,
+        "column_stats": validator.column_stats(),
+    }
 
 @app.post("/pulse/generator/load_sample", tags=["PUEModelGenerator"])
 def load_sample(model_name: str = Form(...)):
     sample_path = os.path.abspath(Path(DATASETS_FOLDER, "sample.csv"))
     dest_path = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
 
-    if not Path(sample_path):
+    if not Path(sample_path).exists():
         return {"error": "Sample file not found."}
 
-    df = pd.read_csv(sample_path, sep=';')
-    df.columns = [col.lower() for col in df.columns]
-    df.to_csv(dest_path, index=False)
+    shutil.copy(sample_path, dest_path)
+    with dataset_cache_lock(dest_path):
+        meta = build_dataset_cache(dest_path)
+        pool = build_example_pool(dest_path, meta)
+        write_example_pool(dest_path, pool)
+    remember_example_pool(dest_path, pool)
 
-    return {"message": "Sample loaded successfully.", "columns": df.columns.tolist()}
+    return {"message": "Sample loaded successfully.", "columns": [c["name"] for c in meta["columns"]]}
 
 @app.post("/pulse/generator/suggest_features", tags=["PUEModelGenerator"])
 def suggest_features(model_name: str = Form(...)):
     file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
-    if not Path(file_location):
+    if not Path(file_location).exists():
         return {"error": "No CSV uploaded yet."}
 
-    df = pd.read_csv(file_location, sep=';')
-    df.columns = [col.lower() for col in df.columns]
+    profile = get_dataset_profile(file_location)
 
-    if 'pue' not in df.columns:
+    if 'pue' not in profile["numeric"]:
         return {"error": "'pue' column not found in uploaded data."}
 
-    corrs = df.corr(numeric_only=True)['pue'].abs().dropna().sort_values(ascending=False)
+    corrs = pd.Series(profile["correlation"]['pue'], dtype=float).abs().dropna().sort_values(ascending=False)
     
     threshold = 0.3
     suggested = corrs[(corrs.index != 'pue') & (corrs > threshold)].index.tolist()
@@ -174,116 +1032,827 @@ def suggest_features(model_name: str = Form(...)):
 
 @app.post("/pulse/generator/train_model", tags=["PUEModelGenerator"])
 async def train_model_async(
-    background_tasks: BackgroundTasks,
     model_name: str = Form(...),
     features: str = Form(...),
     epochs: int = Form(...),
-    test_size: float = Form(...)
+    test_size: float = Form(...),
+    cv_folds: int = Form(0),
+    batch_size: int = Form(None),
+    learning_rate: float = Form(None),
+    early_stopping_patience: int = Form(None),
+    reduce_lr_patience: int = Form(None),
+    min_delta: float = Form(None),
+    model_family: str = Form("ann"),
+    model_params: str = Form(None),
+    priority: int = Form(0),
+    timeout: float = Form(None)
 ):
-    task_id = str(uuid4())
-    task_status[task_id] = "running"
-
-    background_tasks.add_task(
-        train_model_task, task_id, model_name, features, epochs, test_size
+    if cv_folds and not 2 <= cv_folds <= CV_MAX_FOLDS:
+        return {"error": f"cv_folds must be between 2 and {CV_MAX_FOLDS}."}
+    try:
+        options = training.parse_training_options(batch_size, learning_rate, early_stopping_patience, reduce_lr_patience, min_delta)
+        params = training.parse_model_params(model_family, json.loads(model_params) if model_params else None)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    job = training_scheduler.submit(
+        "train", model_name,
+        {
+            "model_name": model_name,
+            "features": json.loads(features),
+            "epochs": epochs,
+            "test_size": test_size,
+            "cv_folds": cv_folds,
+            "training_options": options,
+            "model_family": model_family,
+            "model_params": params,
+        },
+        priority, timeout,
     )
+    return {"status": "started", "task_id": job["id"]}
+
+@app.post("/pulse/generator/fine_tune_model", tags=["PUEModelGenerator"])
+async def fine_tune_model(
+    model_name: str = Form(...),
+    epochs: int = Form(5),
+    test_size: float = Form(20),
+    window_rows: int = Form(None),
+    refit_scaler: bool = Form(False),
+    only_if_better: bool = Form(False),
+    batch_size: int = Form(None),
+    learning_rate: float = Form(None),
+    early_stopping_patience: int = Form(None),
+    reduce_lr_patience: int = Form(None),
+    min_delta: float = Form(None),
+    priority: int = Form(0),
+    timeout: float = Form(None)
+):
+    # Warm start from the saved model on the rows appended since it was trained (or the last
+    # window_rows rows); the new version replaces it unless only_if_better and it scores worse
+    if not model_file(MODEL_FOLDER, model_name).exists():
+        return {"error": "Model not found."}
+    if epochs < 1 or (window_rows is not None and window_rows < 2):
+        return {"error": "epochs must be at least 1 and window_rows at least 2."}
+    try:
+        options = training.parse_training_options(batch_size, learning_rate, early_stopping_patience, reduce_lr_patience, min_delta)
+    except ValueError as e:
+        return {"error": str(e)}
 
-    return {"status": "started", "task_id": task_id}
+    job = training_scheduler.submit(
+        "finetune", model_name,
+        {
+            "model_name": model_name,
+            "epochs": epochs,
+            "test_size": test_size,
+            "window_rows": window_rows,
+            "refit_scaler": refit_scaler,
+            "only_if_better": only_if_better,
+            "training_options": options,
+        },
+        priority, timeout,
+    )
+    return {"status": "started", "task_id": job["id"]}
        
 @app.get("/pue/gen/status/{task_id}")
 def get_training_status(task_id: str):
-    return {"status": task_status.get(task_id, "unknown")}
+    job = training_scheduler.get(task_id)
+    if job is None:
+        return {"status": "unknown"}
+    if job["status"] == "failed":
+        return {"status": f"error: {job['error']}"}
+    return {"status": job["status"]}
+
+# --- AUTOML CANDIDATE STORE ---
+# AutoML candidates are sent from the training workers to this store in the API process instead of
+# being written to temp_models/. They stay in memory up to AUTOML_CANDIDATE_MEMORY_MB, and the
+# oldest ones are spilled to temp_models/<temp_id>.candidate past that. Unsaved candidates expire
+# after AUTOML_CANDIDATE_TTL seconds (swept every AUTOML_CANDIDATE_SWEEP_SECONDS, and on access).
+# /save_automl_model writes the final files straight from here.
+AUTOML_CANDIDATE_MEMORY_MB = float(os.getenv("AUTOML_CANDIDATE_MEMORY_MB", "256"))
+AUTOML_CANDIDATE_TTL = float(os.getenv("AUTOML_CANDIDATE_TTL", "3600"))
+AUTOML_CANDIDATE_SWEEP_SECONDS = 60
+AUTOML_CANDIDATE_FOLDER = Path("temp_models")
+
+class AutoMLCandidateStore:
+    def __init__(self, folder, max_bytes, ttl, sweep_interval):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()  # temp_id -> (created, nbytes, entry), oldest first
+        self._spilled = {}  # temp_id -> created
+        self._spilling = {}  # temp_id -> (created, nbytes, entry) while its spill file is written
+        self._bytes = 0
+        self._lock = Lock()
+        self._scanned = False
+        self.spills = 0
+        self.expirations = 0
+        self.sweep_interval = sweep_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sweep_loop, daemon=True)
+        self._thread.start()
+
+    def put(self, temp_id, entry):
+        nbytes = candidate_nbytes(entry)
+        victims = []
+        with self._lock:
+            self._expire()
+            self._memory[temp_id] = (time.time(), nbytes, entry)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._memory:
+                spilled_id, item = self._memory.popitem(last=False)
+                self._spilling[spilled_id] = item
+                self._bytes -= item[1]
+                victims.append((spilled_id, item))
+
+        # Spill files are written outside the lock; get() serves these candidates from
+        # _spilling meanwhile, and one dropped during its write loses the file afterwards
+        for spilled_id, (created, size, spilled) in victims:
+            path = self._path(spilled_id)
+            written = False
+            try:
+                self.folder.mkdir(parents=True, exist_ok=True)
+                joblib.dump(spilled, path)
+                written = True
+            finally:
+                with self._lock:
+                    kept = self._spilling.pop(spilled_id, None) is not None and written
+                    if kept:
+                        self._spilled[spilled_id] = created
+                        self.spills += 1
+                if not kept:
+                    path.unlink(missing_ok=True)
+
+    def get(self, temp_id):
+        with self._lock:
+            self._expire()
+            if temp_id in self._memory:
+                return self._memory[temp_id][2]
+            if temp_id in self._spilling:
+                return self._spilling[temp_id][2]
+            if temp_id in self._spilled:
+                try:
+                    return joblib.load(self._path(temp_id))
+                except FileNotFoundError:
+                    del self._spilled[temp_id]
+            return None
+
+    def discard(self, temp_id):
+        with self._lock:
+            self._drop(temp_id)
+
+    def clear(self):
+        with self._lock:
+            self._expire()
+            removed = list(self._memory) + list(self._spilling) + list(self._spilled)
+            for temp_id in removed:
+                self._drop(temp_id)
+            return removed
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            return {
+                "in_memory": len(self._memory),
+                "spilled": len(self._spilled) + len(self._spilling),
+                "size_mb": round(self._bytes / 1024 ** 2, 3),
+                "max_mb": round(self.max_bytes / 1024 ** 2, 3),
+                "ttl_seconds": self.ttl,
+                "spills": self.spills,
+                "expirations": self.expirations,
+            }
 
-# --- FUNCION DE ENTRENAMIENTO EN SEGUNDO PLANO ---
+    def close(self):
+        self._stop.set()
+
+    def _sweep_loop(self):
+        # Expired candidates are released even when nobody calls the store
+        while not self._stop.wait(self.sweep_interval):
+            with self._lock:
+                self._expire()
+
+    def _path(self, temp_id):
+        return self.folder / f"{temp_id}.candidate"
+
+    def _drop(self, temp_id):
+        item = self._memory.pop(temp_id, None)
+        if item is not None:
+            self._bytes -= item[1]
+        self._spilling.pop(temp_id, None)
+        if self._spilled.pop(temp_id, None) is not None:
+            self._path(temp_id).unlink(missing_ok=True)
+
+    def _expire(self):
+        if not self._scanned:
+            # Spilled candidates survive a restart until their TTL runs out
+            self._scanned = True
+            if self.folder.exists():
+                for path in self.folder.glob("*.candidate"):
+                    self._spilled.setdefault(path.stem, path.stat().st_mtime)
+        cutoff = time.time() - self.ttl
+        expired = [t for t, item in self._memory.items() if item[0] < cutoff]
+        expired += [t for t, item in self._spilling.items() if item[0] < cutoff]
+        expired += [t for t, created in self._spilled.items() if created < cutoff]
+        for temp_id in expired:
+            self._drop(temp_id)
+        self.expirations += len(expired)
+
+automl_candidates = AutoMLCandidateStore(AUTOML_CANDIDATE_FOLDER, int(AUTOML_CANDIDATE_MEMORY_MB * 1024 ** 2), AUTOML_CANDIDATE_TTL,
+                                         AUTOML_CANDIDATE_SWEEP_SECONDS)
+
+# --- TRAINING JOB HOOKS ---
+# The jobs themselves run inside the scheduler's worker processes (training_jobs.py); these run
+# in the API process once a job has completed.
+def on_train_job_completed(job, result):
+    # Runs in the API process once the worker has written the new artifacts
+    model_cache.invalidate(job["model_name"])
+    stored_data[job["model_name"]] = job["params"]["features"]
+
+def on_finetune_job_completed(job, result):
+    if result.get("promoted"):
+        model_cache.invalidate(job["model_name"])
+
+# --- PROGRESS BUS ---
+# Job events fan out from the scheduler thread to WebSocket, SSE and stream subscribers.
+# publish() never blocks: plain progress ticks are coalesced to PROGRESS_MAX_RATE per job (only the
+# newest tick survives), while candidate summaries and final events always go through, in order.
+# Delivery runs on the server loop, and each job's state is kept so late subscribers can replay it.
+PROGRESS_MAX_RATE = float(os.getenv("PROGRESS_MAX_RATE", "10"))
+PROGRESS_RETENTION_SECONDS = 600
+SSE_KEEPALIVE_SECONDS = 15
+
+class ProgressBus:
+    def __init__(self, max_rate):
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._loop = None
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+
+    def bind(self, loop):
+        self._loop = loop
+
+    def publish(self, job_id, kind, payload):
+        # Safe from any thread
+        with self._lock:
+            self.published += 1
+            channel = self._channel(job_id)
+            channel["seq"] += 1
+            event = (channel["seq"], kind, payload)
+            tick = kind == "progress" and not (isinstance(payload, dict) and payload.get("is_summary"))
+            if tick:
+                channel["latest"] = event
+            elif kind == "progress":
+                channel["summaries"].append(event)
+            else:
+                channel["final"] = event
+                channel["finished"] = time.time()
+
+            now = time.monotonic()
+            if tick and now - channel["last_sent"] < self.interval:
+                if channel["pending"] is not None:
+                    self.coalesced += 1
+                channel["pending"] = event
+                if not channel["flush_scheduled"]:
+                    channel["flush_scheduled"] = True
+                    self._call(self._schedule_flush, job_id, self.interval - (now - channel["last_sent"]))
+                return
+
+            batch = [event]
+            if channel["pending"] is not None:
+                # Keep order: the held-back tick goes out before the summary/final event
+                batch.insert(0, channel["pending"])
+                channel["pending"] = None
+            if tick or len(batch) > 1:
+                channel["last_sent"] = now
+        self._call(self._fanout, job_id, batch)
+
+    def subscribe(self, job_id):
+        # On the server loop; the queue starts with the replayed state of the job
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        with self._lock:
+            channel = self._channel(job_id)
+            replay = channel["summaries"] + [e for e in (channel["latest"], channel["final"]) if e is not None]
+            for _, kind, payload in sorted(replay, key=lambda e: e[0]):
+                events.put_nowait((kind, payload))
+            # Anything up to the current sequence number is already covered by the replay
+            channel["subscribers"].append((events, channel["seq"]))
+        return events
+
+    def unsubscribe(self, job_id, events):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is not None:
+                channel["subscribers"] = [s for s in channel["subscribers"] if s[0] is not events]
+
+    def finished(self, job_id):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            return channel is not None and channel["final"] is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_rate": 1.0 / self.interval if self.interval else None,
+                "channels": len(self._channels),
+                "subscribers": sum(len(c["subscribers"]) for c in self._channels.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+                "coalesced": self.coalesced,
+            }
 
-def train_model_task(task_id: str, model_name: str, features: str, epochs: int, test_size: float):
-    try:
-        features = json.loads(features)
-        file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
-        if not Path(file_location).exists():
-            raise FileNotFoundError(f"Dataset not found: {file_location}")
-
-        df = pd.read_csv(file_location, sep=';')
-        df.columns = [col.lower() for col in df.columns]
-        X = df[features].values
-        y = df['pue'].values
-
-        # First split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size / 100, random_state=42
-        )
+    def _channel(self, job_id):
+        channel = self._channels.get(job_id)
+        if channel is None:
+            cutoff = time.time() - PROGRESS_RETENTION_SECONDS
+            for stale in [j for j, c in self._channels.items() if c["finished"] and c["finished"] < cutoff]:
+                del self._channels[stale]
+            channel = self._channels[job_id] = {
+                "seq": 0, "summaries": [], "latest": None, "final": None, "finished": None,
+                "pending": None, "flush_scheduled": False, "last_sent": 0.0, "subscribers": [],
+            }
+        return channel
+
+    def _call(self, callback, *args):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _schedule_flush(self, job_id, delay):
+        self._loop.call_later(max(delay, 0.0), self._flush, job_id)
+
+    def _flush(self, job_id):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None:
+                return
+            channel["flush_scheduled"] = False
+            event, channel["pending"] = channel["pending"], None
+            if event is None:
+                return
+            channel["last_sent"] = time.monotonic()
+        self._fanout(job_id, [event])
+
+    def _fanout(self, job_id, batch):
+        # Runs on the server loop
+        with self._lock:
+            channel = self._channels.get(job_id)
+            subscribers = list(channel["subscribers"]) if channel else []
+        for events, seen in subscribers:
+            for seq, kind, payload in batch:
+                if seq > seen:
+                    events.put_nowait((kind, payload))
+                    self.delivered += 1
+
+progress_bus = ProgressBus(PROGRESS_MAX_RATE)
+
+async def forward_job_events(websocket: WebSocket, job_id: str):
+    # Pushes a job's progress to a socket until the client goes away
+    await websocket.accept()
+    events = progress_bus.subscribe(job_id)
 
-        # Then scalar using X_train
-        scaler = StandardScaler()
-        X_train = scaler.fit_transform(X_train)
-        X_test = scaler.transform(X_test)
-
-        model = tf.keras.Sequential([
-            tf.keras.layers.Input(shape=(X.shape[1],)),
-            tf.keras.layers.Dense(64, activation='relu'),
-            tf.keras.layers.Dense(32, activation='relu'),
-            tf.keras.layers.Dense(1)
-        ])
-
-        model.compile(optimizer='adam', loss='mse', metrics=['mae', 'mse'])
-
-        def on_epoch_end(epoch, logs):
-            progress = {
-                "epoch": epoch + 1,
-                "total_epochs": epochs,
-                "loss": float(logs["loss"]),
-                "mae": float(logs.get("mae", 0.0)),
-                "mse": float(logs.get("mse", 0.0))
+    async def pump():
+        while True:
+            kind, payload = await events.get()
+            if kind == "progress":
+                await websocket.send_json(payload)
+            elif kind != "completed":
+                await websocket.send_json({"error": payload, "status": kind})
+
+    sender = asyncio.create_task(pump())
+    try:
+        while True:
+            await websocket.receive_text()  # keep the connection open
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        progress_bus.unsubscribe(job_id, events)
+
+# --- TRAINING SCHEDULER ---
+# Training runs in a bounded set of spawned worker processes (TRAINING_WORKERS), fed from a
+# persistent SQLite job queue ordered by priority. Each worker talks to the scheduler over its
+# own pipe, so cancelling or timing out a job just kills that worker and starts a fresh one.
+TRAINING_WORKERS = max(int(os.getenv("TRAINING_WORKERS", "1")), 1)
+TRAINING_JOB_TIMEOUT = float(os.getenv("TRAINING_JOB_TIMEOUT", "3600"))
+TRAINING_DB = Path(CONFIG_PATH, "jobs.db")
+TRAINING_JOB_HOOKS = {"train": on_train_job_completed, "finetune": on_finetune_job_completed}
+FINISHED_JOB_STATES = ("completed", "failed", "cancelled", "timeout")
+scheduler_log = logging.getLogger("uvicorn.error")
+
+class TrainingJobStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                params TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                timeout REAL,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL,
+                progress TEXT,
+                fraction REAL,
+                result TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority, created);
+        """)
+        self._conn.commit()
+
+    def _row(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("params", "progress", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def add(self, kind, model_name, params, priority, timeout):
+        job_id = str(uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, model_name, params, priority, timeout, status, created) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, model_name, json.dumps(params), priority, timeout, time.time()),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._row(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status=None, limit=50):
+        sql, params = "SELECT * FROM jobs", []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [self._row(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def next_queued(self):
+        with self._lock:
+            return self._row(self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created ASC LIMIT 1"
+            ).fetchone())
+
+    def queue_position(self, job):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND (priority > ? OR (priority = ? AND created < ?))",
+                (job["priority"], job["priority"], job["created"]),
+            ).fetchone()[0]
+
+    def update(self, job_id, **fields):
+        for key in ("params", "progress", "result"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key])
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+            self._conn.commit()
+
+    def requeue_running(self):
+        # Jobs interrupted by a restart go back to the queue
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started = NULL, progress = NULL, fraction = NULL WHERE status = 'running'")
+            self._conn.commit()
+
+class TrainingWorker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        # Not daemonic so cross-validation jobs can start their fold processes; the scheduler
+        # stops workers on shutdown and they exit on their own once the pipe closes
+        self.process = ctx.Process(target=training_jobs.training_worker_main, args=(child_conn,), daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.job = None
+        self.deadline = None
+        self.last_write = 0.0
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+class TrainingScheduler:
+    def __init__(self, store, workers, default_timeout):
+        self.store = store
+        self.max_workers = workers
+        self.default_timeout = default_timeout
+        self._lock = threading.RLock()
+        self._workers = []
+        self._live = {}  # job_id -> latest progress kept in memory between store writes
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._in_hand = None  # (worker, job) the scheduler thread is working on
+
+    def start(self, loop=None):
+        with self._lock:
+            if loop is not None:
+                progress_bus.bind(loop)
+            if self._thread is not None:
+                return
+            self.store.requeue_running()
+            self._ctx = multiprocessing.get_context("spawn")
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def submit(self, kind, model_name, params, priority=0, timeout=None):
+        try:
+            self.start(asyncio.get_running_loop())
+        except RuntimeError:
+            self.start()
+        job = self.store.add(kind, model_name, params, priority, timeout or self.default_timeout)
+        self._wake.set()
+        return job
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        live = self._live.get(job_id)
+        if live is not None:
+            job["progress"], job["fraction"] = live
+        now = time.time()
+        job["elapsed_seconds"] = (job["finished"] or now) - job["started"] if job["started"] else None
+        job["eta_seconds"] = None
+        if job["status"] == "running" and job["fraction"]:
+            job["eta_seconds"] = round(job["elapsed_seconds"] * (1 - job["fraction"]) / job["fraction"], 1)
+        job["queue_position"] = self.store.queue_position(job) if job["status"] == "queued" else None
+        return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINISHED_JOB_STATES:
+                return job
+            for worker in self._workers:
+                if worker.job is not None and worker.job["id"] == job_id:
+                    self._retire(worker)
+            self._finish(job, "cancelled", error="Cancelled by user")
+            return self.store.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "alive": sum(1 for w in self._workers if w.process.is_alive()),
+                "busy": sum(1 for w in self._workers if w.job is not None),
+                "running": [w.job["id"] for w in self._workers if w.job is not None],
             }
-            if task_id in active_connections:
-                try:
-                    import asyncio
-                    asyncio.run(active_connections[task_id].send_json(progress))
-                except:
-                    pass
-
-        history = model.fit(
-            X_train, y_train,
-            epochs=epochs,
-            batch_size=16,
-            verbose=0,
-            callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
-        )
 
-        if model_name in loaded_models:
-            del loaded_models[model_name]
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            for worker in self._workers:
+                if worker.job is None:
+                    try:
+                        worker.conn.send(None)
+                    except OSError:
+                        pass
+                worker.process.join(1)
+                if worker.process.is_alive():
+                    worker.kill()
+            self._workers = []
+
+    def _finish(self, job, status, result=None, error=None):
+        live = self._live.pop(job["id"], None)
+        latest = {"progress": live[0], "fraction": live[1]} if live else {}
+        self.store.update(job["id"], status=status, finished=time.time(), result=result, error=error, **latest)
+        if status == "completed" and job["kind"] in TRAINING_JOB_HOOKS:
+            try:
+                TRAINING_JOB_HOOKS[job["kind"]](job, result)
+            except Exception:
+                pass
+        progress_bus.publish(job["id"], status, result if status == "completed" else error)
+
+    def _retire(self, worker):
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+
+    def _handle(self, worker, message):
+        job_id, kind, payload, fraction = message
+        if job_id == "ready":
+            worker.ready = True
+            return
+        if worker.job is None or worker.job["id"] != job_id:
+            return
+        if kind == "progress":
+            previous = self._live.get(job_id)
+            self._live[job_id] = (payload, fraction if fraction is not None else (previous[1] if previous else None))
+            if time.time() - worker.last_write >= 1.0:
+                self.store.update(job_id, progress=payload, fraction=self._live[job_id][1])
+                worker.last_write = time.time()
+            progress_bus.publish(job_id, "progress", payload)
+            return
+        job, worker.job, worker.deadline = worker.job, None, None
+        if kind == "completed":
+            self._finish(job, "completed", result=payload)
+        else:
+            self._finish(job, "failed", error=payload)
 
-        model.save(Path(MODEL_FOLDER, f'{model_name}.h5'), include_optimizer=False)
-        joblib.dump(scaler, Path(MODEL_FOLDER, f'{model_name}_scaler.gz'))
-        stored_data[model_name] = features
+    def _run(self):
+        from multiprocessing.connection import wait
+        while not self._stop.is_set():
+            try:
+                self._step(wait)
+            except Exception:
+                # One bad message, spawn or store write must not stop the scheduler: the job it
+                # was working on fails and the loop carries on
+                scheduler_log.exception("Training scheduler iteration failed")
+                self._drop_in_hand()
+                self._stop.wait(0.5)
+
+    def _drop_in_hand(self):
+        with self._lock:
+            worker, job = self._in_hand or (None, None)
+            self._in_hand = None
+            try:
+                if worker is not None and worker.job is not None:
+                    self._retire(worker)
+                if job is not None:
+                    self._finish(job, "failed", error="Training scheduler error")
+            except Exception:
+                scheduler_log.exception("Could not fail training job %s", job and job["id"])
 
-        with model_lock:
-            model = get_model(model_name)
-            y_pred = model.predict(X_test).flatten()
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
-        loss = history.history['loss'][-1]
-
-        SUMMARY_FOLDER.mkdir(parents=True, exist_ok=True)
-        summary_path = Path(SUMMARY_FOLDER, f"{model_name}.json")
-        with open(summary_path, "w") as f:
-            json.dump({
-                "model_name": model_name,
-                "features": features,
-                "epochs": epochs,
-                "test_size": test_size,
-                "metrics": {
-                    "loss": float(loss),
-                    "mae": float(mae),
-                    "r2": float(r2)
-                }
-            }, f, indent=2)
+    def _step(self, wait):
+        with self._lock:
+            conns = {w.conn: w for w in self._workers}
+        try:
+            ready = wait(list(conns), timeout=0.5) if conns else (self._wake.wait(0.5) and [])
+        except (OSError, ValueError):
+            ready = []  # a worker was retired while we were waiting on it
+        self._wake.clear()
+
+        # Messages are drained under the lock, but AutoML candidates reach the store (which may
+        # spill to disk) outside it, before the events that announce them are published
+        batch, candidates, broken = [], [], []
+        with self._lock:
+            for conn in ready or []:
+                worker = conns[conn]
+                if worker not in self._workers:
+                    continue
+                self._in_hand = (worker, worker.job)
+                try:
+                    while worker.conn.poll():
+                        message = worker.conn.recv()
+                        if message[1] != "candidate":
+                            batch.append((worker, message))
+                        elif worker.job is not None and worker.job["id"] == message[0]:
+                            candidates.append(message[2])
+                except (EOFError, OSError):
+                    broken.append(worker)
+                self._in_hand = None
+        for temp_id, entry in candidates:
+            automl_candidates.put(temp_id, entry)
+
+        with self._lock:
+            # Skips workers a cancel() retired in between
+            for worker, message in batch:
+                if worker not in self._workers:
+                    continue
+                self._in_hand = (worker, worker.job)
+                self._handle(worker, message)
+                self._in_hand = None
+            for worker in broken:
+                if worker not in self._workers:
+                    continue
+                job = worker.job
+                self._in_hand = (worker, job)
+                self._retire(worker)
+                if job is not None:
+                    self._finish(job, "failed", error="Training worker exited unexpectedly")
+                self._in_hand = None
+
+            now = time.time()
+            for worker in list(self._workers):
+                if worker.job is not None and worker.deadline and now > worker.deadline:
+                    job = worker.job
+                    self._in_hand = (worker, job)
+                    self._retire(worker)
+                    self._finish(job, "timeout", error=f"Training exceeded {job['timeout']:.0f}s")
+                    self._in_hand = None
+
+            # Hand queued jobs to idle workers, starting new ones up to the limit
+            while True:
+                idle = next((w for w in self._workers if w.job is None), None)
+                if idle is None and len(self._workers) < self.max_workers:
+                    idle = TrainingWorker(self._ctx)
+                    self._workers.append(idle)
+                if idle is None:
+                    break
+                job = self.store.next_queued()
+                if job is None:
+                    break
+                self._in_hand = (idle, job)
+                started = time.time()
+                self.store.update(job["id"], status="running", started=started)
+                idle.job = {**job, "status": "running", "started": started}
+                idle.deadline = started + job["timeout"] if job["timeout"] else None
+                try:
+                    idle.conn.send((job["id"], job["kind"], job["params"]))
+                except OSError:
+                    self._retire(idle)
+                    self._finish(idle.job, "failed", error="Training worker unavailable")
+                self._in_hand = None
 
-        task_status[task_id] = "completed"
+training_scheduler = TrainingScheduler(TrainingJobStore(TRAINING_DB), TRAINING_WORKERS, TRAINING_JOB_TIMEOUT)
 
-    except Exception as e:
-        task_status[task_id] = f"error: {str(e)}"
+def job_view(job):
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "model_name": job["model_name"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "created": datetime.fromtimestamp(job["created"]).isoformat(),
+        "started": datetime.fromtimestamp(job["started"]).isoformat() if job["started"] else None,
+        "finished": datetime.fromtimestamp(job["finished"]).isoformat() if job["finished"] else None,
+        "timeout": job["timeout"],
+        "progress": job["progress"],
+        "fraction": job["fraction"],
+        "elapsed_seconds": job.get("elapsed_seconds"),
+        "eta_seconds": job.get("eta_seconds"),
+        "queue_position": job.get("queue_position"),
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+@app.get("/pulse/generator/jobs", tags=["PUEModelGenerator"])
+def list_training_jobs(status: Optional[str] = None, limit: int = 50):
+    jobs = [training_scheduler.get(job["id"]) for job in training_scheduler.store.list(status, min(max(limit, 1), 500))]
+    return {"jobs": [job_view(job) for job in jobs if job], "scheduler": training_scheduler.stats()}
+
+@app.get("/pulse/generator/jobs/{job_id}", tags=["PUEModelGenerator"])
+def get_training_job(job_id: str):
+    job = training_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.post("/pulse/generator/jobs/{job_id}/cancel", tags=["PUEModelGenerator"])
+def cancel_training_job(job_id: str):
+    job = training_scheduler.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return {"status": "cancelled", "task_id": job_id}
+
+@app.get("/pulse/generator/jobs/{job_id}/events", tags=["PUEModelGenerator"])
+async def stream_training_job_events(job_id: str):
+    # Server-Sent Events: one "event: <kind>" per progress/summary/final event, ending with the job
+    job = training_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    events = progress_bus.subscribe(job_id)
+    if job["status"] in FINISHED_JOB_STATES and not progress_bus.finished(job_id):
+        # Finished before this process started (or long ago): the store has the outcome
+        events.put_nowait((job["status"], job["result"] if job["status"] == "completed" else job["error"]))
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+                if kind in FINISHED_JOB_STATES:
+                    break
+        finally:
+            progress_bus.unsubscribe(job_id, events)
 
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
+@app.on_event("startup")
+async def start_training_scheduler():
+    progress_bus.bind(asyncio.get_running_loop())
+    training_scheduler.start(asyncio.get_running_loop())
 
 @app.post("/pulse/generator/train_model", tags=["PUEModelGenerator"])
 def train_model(
@@ -296,8 +1865,7 @@ def train_model(
     file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
     if not Path(file_location).exists():
         raise FileNotFoundError(f"Dataset not found: {file_location}")
-    df = pd.read_csv(file_location, sep=';')
-    df.columns = [col.lower() for col in df.columns]
+    df = read_dataset(file_location, features + ['pue'])
     X = df[features].values
     y = df['pue'].values
 
@@ -319,16 +1887,14 @@ def train_model(
     model.compile(optimizer='adam', loss='mse')
     history = model.fit(X_train, y_train, epochs=epochs, batch_size=16, verbose=0)
 
-    if model_name in loaded_models:
-        del loaded_models[model_name]
+    model_cache.invalidate(model_name)
 
     model.save(Path(MODEL_FOLDER, f'{model_name}.h5'), include_optimizer=False)
     joblib.dump(scaler, Path(MODEL_FOLDER, f'{model_name}_scaler.gz'))
+    export_numpy_artifact(model, scaler, Path(MODEL_FOLDER, f'{model_name}_numpy.npz'))
     stored_data[model_name] = features
 
-    with model_lock:
-        model = get_model(model_name)
-        y_pred = model.predict(X_test).flatten()
+    y_pred = model.predict(X_test, verbose=0).flatten()
     mae = mean_absolute_error(y_test, y_pred)
     r2 = r2_score(y_test, y_pred)
     loss = history.history['loss'][-1]
@@ -358,314 +1924,553 @@ def predict_pue(
     save_simulation: bool = Form(False)
 ):
     input_data = json.loads(input)
-    model_path = Path(MODEL_FOLDER, f'{model_name}.h5')
-    scaler_path = Path(MODEL_FOLDER, f'{model_name}_scaler.gz')
 
-    if not model_path.exists() or not scaler_path.exists():
+    try:
+        artifacts = model_cache.get(model_name)
+    except FileNotFoundError:
         return {"error": "Model not trained yet."}
 
-    model = tf.keras.models.load_model(model_path)
-    if not hasattr(model, 'predict'):
-        raise RuntimeError("Model loaded is not ready for prediction.")
-
-    scaler = joblib.load(scaler_path)
-
-    summary_path = Path(SUMMARY_FOLDER, f"{model_name}.json")
-    if not summary_path.exists():
+    if artifacts.summary is None:
         return {"error": "Summary not found."}
 
-    with open(summary_path) as f:
-        summary = json.load(f)
-
-    features = summary.get("features")
+    features = artifacts.features
     if not features:
         return {"error": "Features not defined in summary."}
 
     values = [input_data['values'][feat] for feat in features]
-    X = scaler.transform([values])
-    with model_lock:
-        model = get_model(model_name)
-        prediction = model.predict(X)[0][0]
+    prediction = inference_batcher.predict(artifacts, values)
     prediction = round(float(prediction), 4)
 
-    update_prediction_stats()
+    usage_stats.record_prediction(model_name, "predict")
 
     # Save if required
     if save_simulation:
-        simulations = summary.get("simulations", [])
-        next_id = max((s.get("id", 0) for s in simulations), default=0) + 1
-
-        simulations.append({
-            "id": next_id,
+        history_store.add(model_name, "simulation", {
             "timestamp": datetime.now().isoformat(),
             "inputs": input_data['values'],
             "pue": prediction
         })
 
-        summary["simulations"] = simulations
+    return {"pue_prediction": prediction}
 
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=2)
+# Batch predictions
+def parse_batch_rows(features, rows=None, file=None):
+    # Accepts a JSON array, NDJSON or a CSV upload and returns rows ordered as the model features
+    if file is not None:
+        raw = file.file.read()
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8-sig")
+        sep = detect_separator(raw.split("\n", 1)[0])
+        frame = pd.read_csv(io.StringIO(raw), sep=sep)
+    elif rows is not None and rows.strip():
+        text = rows.strip()
+        if text.startswith("["):
+            records = json.loads(text)
+        else:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        if records and not isinstance(records[0], dict):
+            frame = pd.DataFrame(records, columns=features)
+        else:
+            frame = pd.DataFrame.from_records(records)
+    else:
+        raise ValueError("No rows provided.")
 
-    return {"pue_prediction": prediction}
+    frame.columns = [str(col).strip().lower() for col in frame.columns]
+    missing = [f for f in features if f not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing features in data: {missing}")
 
-def update_prediction_stats():
-    
-    stats_path = Path(CONFIG_PATH, STATISTICS_FILE)
-    Path(CONFIG_PATH).mkdir(parents=True, exist_ok=True)
+    X = frame[features].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    invalid = np.flatnonzero(~np.isfinite(X).all(axis=1))
+    if invalid.size:
+        raise ValueError(f"Invalid or missing values in rows: {invalid[:20].tolist()}")
+    return X
 
-    stats = {
-        "predictions_per_month": {},
-        "llm_questions": 0
-    }
+def predict_batch_values(artifacts, X):
+    # One vectorized scaler transform and forward pass for the whole block
+    return np.round(artifacts.predict(X).astype(np.float64), 4)
 
-    if Path(stats_path):
-        try:
-            with open(stats_path, "r") as f:
-                content = f.read()
-                if content.strip(): 
-                    stats = json.loads(content)
-        except Exception:
-            pass  
+@app.post("/pulse/generator/predict_batch", tags=["PUEModelGenerator"])
+def predict_pue_batch(
+    model_name: str = Form(...),
+    rows: str = Form(None),
+    file: UploadFile = File(None),
+    stream: bool = Form(False),
+    chunk_size: int = Form(BATCH_PREDICT_CHUNK)
+):
+    try:
+        artifacts = model_cache.get(model_name)
+    except FileNotFoundError:
+        return {"error": "Model not trained yet."}
+
+    if artifacts.summary is None:
+        return {"error": "Summary not found."}
 
-    now = datetime.now()
-    key = f"{now.year}-{now.month:02}"
-    stats["predictions_per_month"][key] = stats["predictions_per_month"].get(key, 0) + 1
+    features = artifacts.features
+    if not features:
+        return {"error": "Features not defined in summary."}
 
-    with open(stats_path, "w") as f:
-        json.dump(stats, f, indent=2)
+    try:
+        X = parse_batch_rows(features, rows=rows, file=file)
+    except ValueError as e:
+        return {"error": str(e)}
 
-@app.post("/pulse/generator/example_input", tags=["PUEModelGenerator"])
-def get_example_input(
-    features: str = Form(...),
-    model_name: str = Form(...)
+    if len(X) == 0:
+        return {"features": features, "count": 0, "predictions": []}
+
+    usage_stats.record_prediction(model_name, "predict_batch", len(X))
+
+    if not stream:
+        predictions = predict_batch_values(artifacts, X)
+        return {"features": features, "count": len(predictions), "predictions": predictions.tolist()}
+
+    chunk_size = max(1, chunk_size)
+
+    def prediction_generator():
+        for start in range(0, len(X), chunk_size):
+            block = predict_batch_values(artifacts, X[start:start + chunk_size])
+            yield json.dumps({"offset": start, "predictions": block.tolist()}) + "\n"
+
+    return StreamingResponse(prediction_generator(), media_type="application/x-ndjson")
+
+# Scenario sweeps
+SWEEP_MAX_POINTS = 250000
+PD_MAX_STEPS = 100
+PD_MAX_SAMPLE = 5000
+
+def partial_dependence_curves(artifacts, model_name, steps, sample_size):
+    # All features x grid steps x sampled rows are scored in a single forward pass
+    features = artifacts.features
+    dataset_path = Path(DATASETS_FOLDER, f"{model_name}.csv")
+    if not dataset_path.exists():
+        raise FileNotFoundError("Dataset not found for partial dependence.")
+
+    data = read_dataset(dataset_path, features)
+    missing = [f for f in features if f not in data.columns]
+    if missing:
+        raise ValueError(f"Missing features in data: {missing}")
+    data = data.dropna()
+    if data.empty:
+        raise ValueError("No complete rows available for partial dependence.")
+    if len(data) > sample_size:
+        data = data.sample(sample_size, random_state=42)
+    sample = data.to_numpy(dtype=np.float64)
+
+    grids = np.quantile(sample, np.linspace(0.05, 0.95, steps), axis=0).T  # (n_features, steps)
+    n_rows, n_features = sample.shape
+    X = np.broadcast_to(sample, (n_features, steps, n_rows, n_features)).copy()
+    for i in range(n_features):
+        X[i, :, :, i] = grids[i][:, None]
+
+    y_pred = artifacts.predict(X.reshape(-1, n_features)).reshape(n_features, steps, n_rows)
+    means = y_pred.astype(np.float64).mean(axis=2)
+    return {
+        feat: {"values": grids[i].round(6).tolist(), "pue": means[i].round(4).tolist()}
+        for i, feat in enumerate(features)
+    }
+
+@app.post("/pulse/generator/sweep", tags=["PUEModelGenerator"])
+def sweep_pue(
+    input: str = Form(...),
+    model_name: str = Form(...),
+    axes: str = Form(...),
+    partial_dependence: bool = Form(False),
+    pd_steps: int = Form(20),
+    pd_sample: int = Form(500)
 ):
-    features = json.loads(features)
-    file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
-    if not Path(file_location):
-        return {"error": "No CSV uploaded."}
+    input_data = json.loads(input)
+    axes = json.loads(axes)
 
-    df = pd.read_csv(file_location, sep=';')
-    df.columns = [col.lower() for col in df.columns]
+    try:
+        artifacts = model_cache.get(model_name)
+    except FileNotFoundError:
+        return {"error": "Model not trained yet."}
 
-    missing = [f for f in features if f not in df.columns]
+    features = artifacts.features
+    if not features:
+        return {"error": "Features not defined in summary."}
+
+    if not 1 <= len(axes) <= 2:
+        return {"error": "Provide one or two sweep axes."}
+
+    missing = [f for f in features if f not in input_data['values']]
     if missing:
-        return {"error": f"Missing features in data: {missing}"}
+        return {"error": f"Missing features in input: {missing}"}
+
+    axis_values = []
+    for axis in axes:
+        feature = axis.get("feature")
+        if feature not in features:
+            return {"error": f"Unknown feature '{feature}'."}
+        steps = int(axis.get("steps", 20))
+        if steps < 2:
+            return {"error": "Each axis needs at least 2 steps."}
+        axis_values.append(np.linspace(float(axis["min"]), float(axis["max"]), steps))
+
+    n_points = int(np.prod([len(v) for v in axis_values]))
+    if n_points > SWEEP_MAX_POINTS:
+        return {"error": f"Sweep too large ({n_points} points, max {SWEEP_MAX_POINTS})."}
+
+    # Partial dependence scores features x steps x sampled rows in one pass
+    pd_steps = min(max(2, pd_steps), PD_MAX_STEPS)
+    pd_sample = min(max(1, pd_sample), PD_MAX_SAMPLE)
+    pd_points = len(features) * pd_steps * pd_sample
+    if partial_dependence and pd_points > SWEEP_MAX_POINTS:
+        return {"error": f"Partial dependence too large ({pd_points} points, max {SWEEP_MAX_POINTS}); lower pd_steps or pd_sample."}
+
+    base = np.array([input_data['values'][feat] for feat in features], dtype=np.float64)
+    mesh = np.meshgrid(*axis_values, indexing="ij")
+    X = np.tile(base, (n_points, 1))
+    for axis, grid in zip(axes, mesh):
+        X[:, features.index(axis["feature"])] = grid.reshape(-1)
+
+    y_pred = np.round(artifacts.predict(X).astype(np.float64), 4).reshape(mesh[0].shape)
+    usage_stats.record_prediction(model_name, "sweep", n_points)
+
+    result = {
+        "axes": [{"feature": axis["feature"], "values": values.round(6).tolist()} for axis, values in zip(axes, axis_values)],
+        "pue": y_pred.tolist(),
+        "min": {"pue": float(y_pred.min()), "at": [float(v[i]) for v, i in zip(axis_values, np.unravel_index(y_pred.argmin(), y_pred.shape))]},
+        "max": {"pue": float(y_pred.max()), "at": [float(v[i]) for v, i in zip(axis_values, np.unravel_index(y_pred.argmax(), y_pred.shape))]},
+    }
 
-    row = df[features].dropna().sample(1).iloc[0]
-    return {"example": row.to_dict()}
+    if partial_dependence:
+        try:
+            result["partial_dependence"] = partial_dependence_curves(artifacts, model_name, pd_steps, pd_sample)
+        except (FileNotFoundError, ValueError) as e:
+            result["partial_dependence_error"] = str(e)
 
-@app.websocket("/ws/automl/{task_id}")
-async def websocket_automl(websocket: WebSocket, task_id: str):
-    await websocket.accept()
-    active_connections[task_id] = websocket
+    return result
+
+# Setpoint optimizer
+def latin_hypercube(rng, n, lower, upper):
+    d = len(lower)
+    cut = (np.arange(n)[:, None] + rng.random((n, d))) / n
+    for j in range(d):
+        cut[:, j] = cut[rng.permutation(n), j]
+    return lower + cut * (upper - lower)
+
+OPTIMIZE_STALL_ITERATIONS = 10
+OPTIMIZE_TOLERANCE = 1e-6
+
+@app.post("/pulse/generator/optimize", tags=["PUEModelGenerator"])
+def optimize_setpoints(
+    model_name: str = Form(...),
+    bounds: str = Form("{}"),
+    fixed: str = Form("{}"),
+    population: int = Form(256),
+    iterations: int = Form(40),
+    elite_fraction: float = Form(0.1),
+    time_budget: float = Form(10.0),
+    seed: int = Form(42)
+):
     try:
-        while True:
-            await websocket.receive_text()  # mantener conexión viva
-    except WebSocketDisconnect:
-        del active_connections[task_id]
-        
-def automl_training_task(task_id: str, model_name: str, features: str, epochs_options: str, test_size_options: str):
+        bounds = json.loads(bounds)
+        fixed = json.loads(fixed)
+    except ValueError:
+        return {"error": "bounds and fixed must be JSON objects."}
+    if not isinstance(bounds, dict) or not isinstance(fixed, dict):
+        return {"error": "bounds and fixed must be JSON objects."}
     try:
-        features = json.loads(features)
-        epochs_options = json.loads(epochs_options)
-        test_size_options = json.loads(test_size_options)
-
-        file_location = Path(DATASETS_FOLDER) / f"{model_name}.csv"
-        if not file_location.exists():
-            raise FileNotFoundError(f"Dataset not found: {file_location}")
+        fixed = {f: float(value) for f, value in fixed.items()}
+        bounds = {f: [float(lo), float(hi)] for f, (lo, hi) in bounds.items()}
+    except (TypeError, ValueError):
+        return {"error": "Fixed values must be numbers and each bound a [min, max] pair of numbers."}
+    if not all(np.isfinite(v) for v in list(fixed.values()) + [x for pair in bounds.values() for x in pair]):
+        return {"error": "Fixed values and bounds must be finite."}
 
-        df = pd.read_csv(file_location, sep=';')
-        df.columns = [col.lower() for col in df.columns]
-        X = df[features].values
-        y = df['pue'].values
+    try:
+        artifacts = model_cache.get(model_name)
+    except FileNotFoundError:
+        return {"error": "Model not trained yet."}
 
-        total_models = len(epochs_options) * len(test_size_options)
-        model_counter = 0
+    features = artifacts.features
+    if not features:
+        return {"error": "Features not defined in summary."}
 
-        for test_size in test_size_options:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size / 100, random_state=42
-            )
+    unknown = [f for f in list(bounds) + list(fixed) if f not in features]
+    if unknown:
+        return {"error": f"Unknown features: {unknown}"}
+
+    free = [f for f in features if f not in fixed]
+    if not free:
+        return {"error": "All features are fixed, nothing to optimize."}
+
+    # Features without explicit bounds are searched over their observed dataset range
+    unbounded = [f for f in free if f not in bounds]
+    if unbounded:
+        dataset_path = Path(DATASETS_FOLDER, f"{model_name}.csv")
+        if not dataset_path.exists():
+            return {"error": f"Missing bounds for features: {unbounded}"}
+        data = read_dataset(dataset_path, unbounded)
+        missing = [f for f in unbounded if f not in data.columns]
+        if missing:
+            return {"error": f"Missing bounds for features: {missing}"}
+        for f in unbounded:
+            bounds[f] = [float(data[f].min()), float(data[f].max())]
+
+    lower = np.array([bounds[f][0] for f in free])
+    upper = np.array([bounds[f][1] for f in free])
+    if np.any(upper < lower):
+        return {"error": "Each bound must be [min, max] with min <= max."}
+
+    free_idx = [features.index(f) for f in free]
+    base = np.zeros(len(features))
+    for f, value in fixed.items():
+        base[features.index(f)] = value
+
+    def evaluate(candidates):
+        X = np.tile(base, (len(candidates), 1))
+        X[:, free_idx] = candidates
+        return artifacts.predict(X).astype(np.float64)
+
+    rng = np.random.default_rng(seed)
+    population = max(8, population)
+    n_elite = max(2, int(population * elite_fraction))
+    started = time.perf_counter()
+
+    # Latin hypercube start, then cross-entropy updates of a diagonal Gaussian around the elites
+    candidates = latin_hypercube(rng, population, lower, upper)
+    scores = evaluate(candidates)
+    best_idx = int(scores.argmin())
+    best_x, best_pue = candidates[best_idx].copy(), float(scores[best_idx])
+    evaluations = len(candidates)
+    span = np.where(upper > lower, upper - lower, 1.0)
+    trace = [{"iteration": 0, "best_pue": round(best_pue, 6), "elite_mean_pue": round(float(np.sort(scores)[:n_elite].mean()), 6), "evaluations": evaluations}]
+
+    converged = False
+    best_history = [best_pue]
+    for iteration in range(1, iterations + 1):
+        elite = candidates[np.argsort(scores)[:n_elite]]
+        mean = elite.mean(axis=0)
+        spread = elite.std(axis=0)
+        # Converged once the elites have collapsed (the floor below only keeps sampling alive)
+        # or the best score has stopped improving
+        stalled = len(best_history) > OPTIMIZE_STALL_ITERATIONS and best_history[-1 - OPTIMIZE_STALL_ITERATIONS] - best_pue < OPTIMIZE_TOLERANCE
+        converged = bool(np.all(spread / span < 1e-3)) or stalled
+        if converged or time.perf_counter() - started > time_budget:
+            break
+        std = spread + 1e-3 * span
+
+        candidates = np.clip(rng.normal(mean, std, size=(population, len(free))), lower, upper)
+        candidates[0] = best_x
+        scores = evaluate(candidates)
+        evaluations += len(candidates)
+
+        idx = int(scores.argmin())
+        if scores[idx] < best_pue:
+            best_x, best_pue = candidates[idx].copy(), float(scores[idx])
+        best_history.append(best_pue)
+        trace.append({"iteration": iteration, "best_pue": round(best_pue, 6), "elite_mean_pue": round(float(np.sort(scores)[:n_elite].mean()), 6), "evaluations": evaluations})
+
+    best = {f: float(v) for f, v in fixed.items()}
+    best.update({f: float(v) for f, v in zip(free, best_x)})
 
-            scaler = StandardScaler()
-            X_train = scaler.fit_transform(X_train)
-            X_test = scaler.transform(X_test)
-
-            for epochs in epochs_options:
-                model_counter += 1
-
-                model = tf.keras.Sequential([
-                    tf.keras.layers.Dense(64, activation='relu', input_shape=(X.shape[1],)),
-                    tf.keras.layers.Dense(32, activation='relu'),
-                    tf.keras.layers.Dense(1)
-                ])
-
-                model.compile(optimizer='adam', loss='mse', metrics=['mae', 'mse'])
-
-                def on_epoch_end(epoch, logs):
-                    progress = {
-                        "model_idx": model_counter,
-                        "total_models": total_models,
-                        "epoch": epoch + 1,
-                        "total_epochs": epochs,
-                        "loss": float(logs["loss"]),
-                        "mae": float(logs.get("mae", 0.0)),
-                        "mse": float(logs.get("mse", 0.0)),
-                        "test_size": test_size
-                    }
-                    if task_id in active_connections:
-                        import asyncio
-                        asyncio.run(active_connections[task_id].send_json(progress))
-
-                model.fit(
-                    X_train, y_train,
-                    epochs=epochs,
-                    batch_size=16,
-                    verbose=0,
-                    callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
-                )
+    return {
+        "best": {f: best[f] for f in features},
+        "pue_prediction": round(best_pue, 4),
+        "bounds": {f: [float(lo), float(hi)] for f, lo, hi in zip(free, lower, upper)},
+        "evaluations": evaluations,
+        "converged": converged,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "trace": trace,
+    }
 
-                y_pred = model.predict(X_test).flatten()
-                loss = mean_squared_error(y_test, y_pred)
-                mae = mean_absolute_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-
-                temp_id = str(uuid.uuid4())
-                temp_folder = Path("temp_models") / temp_id
-                temp_folder.mkdir(parents=True, exist_ok=True)
-                model.save(temp_folder / "model.h5", include_optimizer=False)
-                joblib.dump(scaler, temp_folder / "scaler.gz")
-
-                summary = {
-                    "model_name": model_name,
-                    "features": features,
-                    "epochs": epochs,
-                    "test_size": test_size,
-                    "metrics": {
-                        "loss": float(loss),
-                        "mae": float(mae),
-                        "r2": float(r2)
-                    }
-                }
-                with open(temp_folder / "summary.json", "w") as f:
-                    json.dump(summary, f, indent=2)
-
-                if task_id in active_connections:
-                    import asyncio
-                    asyncio.run(active_connections[task_id].send_json({
-                        "model_idx": model_counter,
-                        "total_models": total_models,
-                        "epochs": epochs,
-                        "test_size": test_size,
-                        "loss": round(float(loss), 6),
-                        "mae": round(float(mae), 6),
-                        "r2": round(float(r2), 6),
-                        "temp_id": temp_id,
-                        "is_summary": True  # clave para distinguir
-                    }))
+@app.post("/pulse/generator/example_input", tags=["PUEModelGenerator"])
+def get_example_input(
+    features: str = Form(...),
+    model_name: str = Form(...),
+    count: int = Form(1),
+    stratify: bool = Form(False)
+):
+    features = json.loads(features)
+    file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
+    if not Path(file_location).exists():
+        return {"error": "No CSV uploaded."}
+    count = min(max(count, 1), EXAMPLE_MAX_COUNT)
+
+    pool = get_example_pool(file_location)
+    rng = np.random.default_rng()
+    rows, strata = None, None
+    if all(f in pool["columns"] for f in features):
+        X = pool["values"][:, [pool["columns"].index(f) for f in features]]
+        candidates = np.flatnonzero(np.isfinite(X).all(axis=1))
+        if stratify and "pue" in pool["columns"] and len(candidates):
+            # One example per PUE quantile bin
+            pue = pool["values"][candidates, pool["columns"].index("pue")]
+            edges = np.quantile(pue, np.linspace(0, 1, count + 1))
+            bins = np.clip(np.searchsorted(edges, pue, side="right") - 1, 0, count - 1)
+            picks, strata = [], []
+            for b in range(count):
+                members = candidates[bins == b]
+                if len(members):
+                    picks.append(rng.choice(members))
+                    strata.append({"pue_min": float(edges[b]), "pue_max": float(edges[b + 1])})
+            rows = X[picks]
+        elif len(candidates):
+            rows = X[rng.choice(candidates, min(count, len(candidates)), replace=False)]
+
+    if rows is None:
+        # Non-numeric features or no complete row in the pool: fall back to scanning the dataset
+        df = read_dataset(file_location, features)
+        missing = [f for f in features if f not in df.columns]
+        if missing:
+            return {"error": f"Missing features in data: {missing}"}
+        complete = df[features].dropna()
+        if complete.empty:
+            return {"error": "No complete rows for the selected features."}
+        rows = complete.sample(min(count, len(complete))).to_numpy()
+
+    examples = [dict(zip(features, (v.item() if hasattr(v, "item") else v for v in row))) for row in rows]
+    result = {"example": examples[0]}
+    if count > 1 or stratify:
+        result["examples"] = examples
+    if strata is not None:
+        result["strata"] = strata
+    return result
 
-    except Exception as e:
-        if task_id in active_connections:
-            import asyncio
-            asyncio.run(active_connections[task_id].send_json({"error": str(e)}))
+@app.websocket("/ws/automl/{task_id}")
+async def websocket_automl(websocket: WebSocket, task_id: str):
+    await forward_job_events(websocket, task_id)
+        
+def automl_job_spec(model_name, features, epochs_options, test_size_options, share_epochs,
+                    strategy, search_space, budget, eta, seed, cv_folds=0, options=None, model_families=None):
+    # Maps the AutoML form fields to a scheduler job; raises ValueError on bad input
+    test_sizes = json.loads(test_size_options) if test_size_options else []
+    families = json.loads(model_families) if model_families else ["ann"]
+    for family in families:
+        training.parse_model_params(family)
+    if cv_folds and not 2 <= cv_folds <= CV_MAX_FOLDS:
+        raise ValueError(f"cv_folds must be between 2 and {CV_MAX_FOLDS}.")
+    if strategy == "grid":
+        if ("ann" in families and not epochs_options) or not (test_sizes or cv_folds):
+            raise ValueError("Grid search needs epochs_options and test_size_options (or cv_folds).")
+        return "automl", {
+            "model_name": model_name,
+            "features": json.loads(features),
+            "epochs_options": json.loads(epochs_options) if epochs_options else [],
+            "test_size_options": test_sizes,
+            "share_epochs": share_epochs,
+            "cv_folds": cv_folds,
+            "training_options": options,
+            "model_families": families,
+        }
+    if strategy == "halving":
+        if cv_folds:
+            raise ValueError("cv_folds is only supported by the grid strategy.")
+        if families != ["ann"]:
+            raise ValueError("The halving strategy only searches ann models.")
+        if options and options != training.DEFAULT_TRAINING_OPTIONS:
+            raise ValueError("The halving strategy searches batch size and learning rate itself; use search_space.")
+        space = parse_search_space(search_space)
+        budget = budget or AUTOML_SEARCH_BUDGET
+        if eta < 2:
+            raise ValueError("eta must be at least 2.")
+        if budget < space["max_epochs"]:
+            raise ValueError("budget must be at least max_epochs.")
+        return "automl_search", {
+            "model_name": model_name,
+            "features": json.loads(features),
+            "test_size": test_sizes[0] if test_sizes else 20,
+            "search_space": space,
+            "budget": budget,
+            "eta": eta,
+            "seed": seed,
+        }
+    raise ValueError("strategy must be 'grid' or 'halving'.")
 
 @app.post("/pulse/generator/automl_train_ws", tags=["PUEModelGenerator"])
 async def launch_automl_ws(
-    background_tasks: BackgroundTasks,
     model_name: str = Form(...),
     features: str = Form(...),
-    epochs_options: str = Form(...),
-    test_size_options: str = Form(...)
+    epochs_options: str = Form(None),
+    test_size_options: str = Form(None),
+    share_epochs: bool = Form(True),
+    strategy: str = Form("grid"),
+    search_space: str = Form(None),
+    budget: int = Form(None),
+    eta: int = Form(3),
+    seed: int = Form(None),
+    cv_folds: int = Form(0),
+    batch_size: int = Form(None),
+    learning_rate: float = Form(None),
+    early_stopping_patience: int = Form(None),
+    reduce_lr_patience: int = Form(None),
+    min_delta: float = Form(None),
+    model_families: str = Form(None),
+    priority: int = Form(0),
+    timeout: float = Form(None)
 ):
-    task_id = str(uuid.uuid4())
-    background_tasks.add_task(
-        automl_training_task,
-        task_id,
-        model_name,
-        features,
-        epochs_options,
-        test_size_options,
-    )
-    return {"status": "started", "task_id": task_id}
+    try:
+        options = training.parse_training_options(batch_size, learning_rate, early_stopping_patience, reduce_lr_patience, min_delta)
+        kind, params = automl_job_spec(model_name, features, epochs_options, test_size_options, share_epochs,
+                                       strategy, search_space, budget, eta, seed, cv_folds, options,
+                                       model_families)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    job = training_scheduler.submit(kind, model_name, params, priority, timeout)
+    return {"status": "started", "task_id": job["id"]}
 
 
 @app.post("/pulse/generator/automl_train", tags=["PUEModelGenerator"])
 async def automl_train_streaming(
     model_name: str = Form(...),
     features: str = Form(...),
-    epochs_options: str = Form(...),
-    test_size_options: str = Form(...)
+    epochs_options: str = Form(None),
+    test_size_options: str = Form(None),
+    share_epochs: bool = Form(True),
+    strategy: str = Form("grid"),
+    search_space: str = Form(None),
+    budget: int = Form(None),
+    eta: int = Form(3),
+    seed: int = Form(None),
+    cv_folds: int = Form(0),
+    batch_size: int = Form(None),
+    learning_rate: float = Form(None),
+    early_stopping_patience: int = Form(None),
+    reduce_lr_patience: int = Form(None),
+    min_delta: float = Form(None),
+    model_families: str = Form(None),
+    priority: int = Form(0),
+    timeout: float = Form(None)
 ):
-    features = json.loads(features)
-    epochs_options = json.loads(epochs_options)
-    test_size_options = json.loads(test_size_options)
-
     file_location = Path(DATASETS_FOLDER) / f"{model_name}.csv"
     if not file_location.exists():
         return {"error": "Dataset not found."}
 
-    df = pd.read_csv(file_location, sep=';')
-    df.columns = [col.lower() for col in df.columns]
+    try:
+        options = training.parse_training_options(batch_size, learning_rate, early_stopping_patience, reduce_lr_patience, min_delta)
+        kind, params = automl_job_spec(model_name, features, epochs_options, test_size_options, share_epochs,
+                                       strategy, search_space, budget, eta, seed, cv_folds, options,
+                                       model_families)
+    except ValueError as e:
+        return {"error": str(e)}
 
-    X = df[features].values
-    y = df['pue'].values
+    params["loss_metric"] = "train"
+    job = training_scheduler.submit(kind, model_name, params, priority, timeout)
+    events = progress_bus.subscribe(job["id"])
 
     async def model_generator():
-        for test_size in test_size_options:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size/100, random_state=42
-            )
-
-            # Fit scaler only on training data
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-
-            for epochs in epochs_options:
-                model = tf.keras.Sequential([
-                    tf.keras.layers.Dense(64, activation='relu', input_shape=(X.shape[1],)),
-                    tf.keras.layers.Dense(32, activation='relu'),
-                    tf.keras.layers.Dense(1)
-                ])
-
-                model.compile(optimizer='adam', loss='mse')
-                history = model.fit(X_train_scaled, y_train, epochs=epochs, batch_size=16, verbose=0)
-
-                y_pred = model.predict(X_test_scaled).flatten()
-                loss = history.history['loss'][-1]
-                mae = mean_absolute_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-
-                temp_id = str(uuid.uuid4())
-                temp_folder = Path("temp_models") / temp_id
-                temp_folder.mkdir(parents=True, exist_ok=True)
-
-                model.save(temp_folder / "model.h5", include_optimizer=False)
-                joblib.dump(scaler, temp_folder / "scaler.gz")
-
-                summary = {
-                    "model_name": model_name,
-                    "features": features,
-                    "epochs": epochs,
-                    "test_size": test_size,
-                    "metrics": {
-                        "loss": float(loss),
-                        "mae": float(mae),
-                        "r2": float(r2)
-                    }
-                }
-                with open(temp_folder / "summary.json", "w") as f:
-                    json.dump(summary, f, indent=2)
-
-                yield json.dumps({
-                    "temp_id": temp_id,
-                    "epochs": epochs,
-                    "test_size": test_size,
-                    "loss": round(float(loss), 6),
-                    "mae": round(float(mae), 6),
-                    "r2": round(float(r2), 6)
-                }) + "\n"
+        try:
+            while True:
+                kind, payload = await events.get()
+                if kind == "progress" and payload.get("is_summary"):
+                    line = {key: payload[key] for key in ("temp_id", "epochs", "test_size", "loss", "mae", "r2")}
+                    for key in ("model_family", "hyperparameters"):
+                        if key in payload:
+                            line[key] = payload[key]
+                    yield json.dumps(line) + "\n"
+                elif kind == "completed":
+                    break
+                elif kind in ("failed", "cancelled", "timeout"):
+                    yield json.dumps({"error": payload}) + "\n"
+                    break
+        finally:
+            progress_bus.unsubscribe(job["id"], events)
+            # Nobody is left to receive the results. Cancelling may kill and join a worker, so it
+            # runs in the executor; not awaited, since a disconnect cancels this generator
+            asyncio.get_running_loop().run_in_executor(None, training_scheduler.cancel, job["id"])
 
     return StreamingResponse(model_generator(), media_type="application/json")
 
@@ -674,22 +2479,14 @@ class SaveAutoMLRequest(BaseModel):
     final_model_name: str
 
 @app.post("/pulse/generator/save_automl_model", tags=["PUEModelGenerator"])
-async def save_automl_model(payload: SaveAutoMLRequest):
+def save_automl_model(payload: SaveAutoMLRequest):
     temp_id = payload.model_temp_id
     final_name = payload.final_model_name
 
-    temp_folder = Path("temp_models") / temp_id
-    if not temp_folder.exists():
+    entry = automl_candidates.get(temp_id)
+    if entry is None:
         return {"error": "Temporary model not found."}
 
-    model_path = temp_folder / "model.h5"
-    scaler_path = temp_folder / "scaler.gz"
-    summary_path = temp_folder / "summary.json"
-
-    if not model_path.exists() or not scaler_path.exists() or not summary_path.exists():
-        return {"error": "Incomplete model files."}
-
-    model_dest = Path(MODEL_FOLDER) / f"{final_name}.h5"
     scaler_dest = Path(MODEL_FOLDER) / f"{final_name}_scaler.gz"
     summary_dest = Path(SUMMARY_FOLDER) / f"{final_name}.json"
 
@@ -697,14 +2494,15 @@ async def save_automl_model(payload: SaveAutoMLRequest):
     os.makedirs(SUMMARY_FOLDER, exist_ok=True)
     
     # Remove old version from cache if it exists
-    if final_name in loaded_models:
-        del loaded_models[final_name]
+    model_cache.invalidate(final_name)
 
-    shutil.copy(model_path, model_dest)
-    shutil.copy(scaler_path, scaler_dest)
+    # save_model_file also drops a previous model of another family under the same name
+    with model_lock:
+        model, scaler = unpack_candidate(entry)
+        save_model_file(model, scaler, MODEL_FOLDER, final_name, Path(MODEL_FOLDER) / f"{final_name}_numpy.npz")
+    joblib.dump(scaler, scaler_dest)
 
-    with open(summary_path) as f:
-        summary = json.load(f)
+    summary = dict(entry["summary"])
     summary["model_name"] = final_name
     with open(summary_dest, "w") as f:
         json.dump(summary, f, indent=2)
@@ -714,7 +2512,7 @@ async def save_automl_model(payload: SaveAutoMLRequest):
     if original_csv_path.exists():
         shutil.copy(original_csv_path, final_csv_path)
 
-    shutil.rmtree(temp_folder)
+    automl_candidates.discard(temp_id)
 
     return {"message": "Model saved successfully!"}
 
@@ -725,20 +2523,9 @@ async def simulation_delete(model_name: str = Form(...), sim_id: int = Form(...)
     if not summary_path.exists():
         return {"error": "Summary not found."}
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        summary = json.load(f)
-
-    simulations = summary.get("simulations", [])
-    initial_count = len(simulations)
-
-    summary["simulations"] = [s for s in simulations if s.get("id") != sim_id]
-
-    if len(summary["simulations"]) == initial_count:
+    if not history_store.delete(model_name, "simulation", item_id=sim_id):
         return {"error": f"Simulation with id {sim_id} not found."}
 
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
-
     return {"message": f"Simulation {sim_id} deleted successfully."}
 
 @app.post("/pulse/explorer/simulations/clear", tags=["PUEModelExplorer"])
@@ -748,14 +2535,7 @@ async def simulations_clear(model_name: str = Form(...)):
     if not summary_path.exists():
         return {"error": "Summary not found."}
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        summary = json.load(f)
-
-    if "simulations" in summary:
-        summary["simulations"] = []
-
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=2)
+    history_store.delete(model_name, "simulation")
 
     return {"message": "All simulations cleared."}
 
@@ -764,7 +2544,7 @@ async def simulations_clear(model_name: str = Form(...)):
 def list_models():
     if not MODEL_FOLDER.exists():
         return {"models": []}
-    model_names = [f.stem for f in MODEL_FOLDER.iterdir() if f.suffix == ".h5"]
+    model_names = [f.stem for f in MODEL_FOLDER.iterdir() if f.suffix in (".h5", ".joblib")]
     return {"models": model_names}
 
 @app.get("/pulse/explorer/summary/{model_name}", tags=["PUEModelExplorer"])
@@ -773,7 +2553,10 @@ def get_model_summary(model_name: str):
     if not Path(summary_file):
         return {"error": "Summary not found"}
     with open(summary_file, "r") as f:
-        return json.load(f)
+        summary = json.load(f)
+    summary["simulations"] = history_store.list(model_name, "simulation")
+    summary["llm_history"] = history_store.list(model_name, "llm")
+    return summary
 
 @app.delete("/pulse/explorer/delete/{model_name}", tags=["PUEModelExplorer"])
 def delete_model(model_name: str):
@@ -781,11 +2564,18 @@ def delete_model(model_name: str):
     errors = []
 
     files_to_delete = (
-        list(MODEL_FOLDER.glob(f"{model_name}*")) +
+        [Path(MODEL_FOLDER, f"{model_name}{suffix}") for suffix in (".h5", ".joblib", "_scaler.gz", "_numpy.npz")] +
         list(SUMMARY_FOLDER.glob(f"{model_name}.json")) +
         list(DATASETS_FOLDER.glob(f"{model_name}.csv"))
     )
 
+    model_cache.invalidate(model_name)
+    history_store.drop_model(model_name)
+    drop_dataset_cache(Path(DATASETS_FOLDER, f"{model_name}.csv"))
+    if MODEL_VERSIONS_FOLDER.joinpath(model_name).is_dir():
+        shutil.rmtree(MODEL_VERSIONS_FOLDER / model_name, ignore_errors=True)
+        deleted.append(str(MODEL_VERSIONS_FOLDER / model_name))
+
     for path in files_to_delete:
         if path.exists():
             try:
@@ -798,16 +2588,19 @@ def delete_model(model_name: str):
 
 @app.get("/pulse/explorer/download/{model_name}.zip", tags=["PUEModelExplorer"])
 def download_model_zip(model_name: str):
-    model_path = Path(MODEL_FOLDER, f"{model_name}.h5")
+    model_path = model_file(MODEL_FOLDER, model_name)
     scaler_path = Path(MODEL_FOLDER, f"{model_name}_scaler.gz")
+    engine_path = Path(MODEL_FOLDER, f"{model_name}_numpy.npz")
     csv_path = Path(DATASETS_FOLDER, f"{model_name}.csv")
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp:
         with zipfile.ZipFile(tmp.name, 'w') as zipf:
             if Path(model_path):
-                zipf.write(model_path, arcname=f"{model_name}.h5")
+                zipf.write(model_path, arcname=model_path.name)
             if Path(scaler_path):
                 zipf.write(scaler_path, arcname=f"{model_name}_scaler.gz")
+            if engine_path.exists():
+                zipf.write(engine_path, arcname=f"{model_name}_numpy.npz")
             if Path(csv_path):
                 zipf.write(csv_path, arcname=f"{model_name}.csv")
         zip_path = tmp.name
@@ -823,14 +2616,11 @@ async def list_datasets():
     return {"datasets": datasets}
 
 @app.get("/pulse/datasets/load/{dataset_name}", tags=["PUEDatasets"])
-async def load_dataset(dataset_name: str):
+def load_dataset(dataset_name: str):
     dataset_path = DATASETS_FOLDER / dataset_name
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    # Read dataset
-    df = pd.read_csv(dataset_path, sep=';')
-
     # Find associated model
     model_name = dataset_name.rsplit('.', 1)[0]
     summary_path = Path("summaries") / f"{model_name}.json"
@@ -843,21 +2633,400 @@ async def load_dataset(dataset_name: str):
         summary_data = json.load(f)
     features = summary_data.get("features", [])
 
-    # Filter contained features
-    filtered_df = df[[col for col in features if col in df.columns]]
+    # Read only the contained features; the summary comes from the precomputed profile
+    filtered_df = read_dataset(dataset_path, features, nrows=100)
 
-    sample = filtered_df.head(100).to_dict(orient="records")
-    summary = filtered_df.describe().to_dict()
+    sample = filtered_df.to_dict(orient="records")
+    summary = profile_describe(get_dataset_profile(dataset_path), filtered_df.columns.tolist())
 
     return {
         "sample": sample,
         "summary": summary,
         "columns": filtered_df.columns.tolist()
     }
+
+@app.get("/pulse/datasets/profile/{dataset_name}", tags=["PUEDatasets"])
+async def dataset_profile(dataset_name: str):
+    dataset_path = DATASETS_FOLDER / dataset_name
+    if not dataset_path.exists():
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    profile = await run_in_threadpool(get_dataset_profile, dataset_path)
+    return {
+        "content_hash": profile["content_hash"],
+        "rows": profile["rows"],
+        "columns": profile["columns"],
+        "summary": profile_describe(profile),
+        "correlation": profile["correlation"],
+    }
 	
+# Appending telemetry: new rows are validated against the stored schema and appended to the
+# CSV, the column files and the profile without touching the existing data
+APPEND_MAX_INVALID_SAMPLES = 20
+
+def parse_append_batch(raw, filename, content_type):
+    text = raw.decode("utf-8-sig", errors="replace")
+    rows, lines, invalid = [], [], []
+    if filename.lower().endswith((".ndjson", ".jsonl", ".json")) or "json" in (content_type or "") or text.lstrip().startswith("{"):
+        for line_no, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError
+            except ValueError:
+                invalid.append({"line": line_no, "reason": "not a JSON object"})
+                continue
+            rows.append({str(k).strip().lower(): "" if v is None else str(v) for k, v in record.items()})
+            lines.append(line_no)
+        frame = pd.DataFrame.from_records(rows).fillna("") if rows else pd.DataFrame()
+        return frame, lines, invalid
+
+    reader = csv.reader(text.splitlines(), delimiter=detect_separator(text.split("\n", 1)[0]))
+    header = next(reader, None)
+    if header is None:
+        return pd.DataFrame(), lines, invalid
+    columns = [str(col).strip().lower() for col in header]
+    for line_no, fields in enumerate(reader, 2):
+        if not fields or (len(fields) == 1 and not fields[0].strip()):
+            continue
+        if len(fields) != len(columns):
+            invalid.append({"line": line_no, "reason": f"expected {len(columns)} fields, got {len(fields)}"})
+            continue
+        rows.append(fields)
+        lines.append(line_no)
+    return pd.DataFrame(rows, columns=columns, dtype=object), lines, invalid
+
+def validate_append_batch(meta, frame, lines, invalid):
+    expected = [c["name"] for c in meta["columns"]]
+    missing = [c for c in expected if c not in frame.columns]
+    unexpected = [c for c in frame.columns if c not in expected]
+    if missing or unexpected:
+        raise HTTPException(status_code=400, detail=f"Schema mismatch: missing {missing}, unexpected {unexpected}")
+
+    frame = frame[expected].apply(lambda col: col.str.strip())
+    bad = pd.Series(False, index=frame.index)
+    for column in meta["columns"]:
+        raw = frame[column["name"]]
+        empty = raw == ""
+        if column["kind"] == "numeric":
+            parsed = pd.to_numeric(raw.where(~empty), errors="coerce")
+            failed = (~empty & parsed.isna()) | ((empty | parsed.isna()) if column["name"] == "pue" else False)
+        elif column["kind"] == "datetime":
+            failed = ~empty & pd.to_datetime(raw.where(~empty), errors="coerce", format="mixed").isna()
+        else:
+            continue
+        for i in np.flatnonzero((failed & ~bad).to_numpy()):
+            invalid.append({"line": lines[i], "reason": f"invalid value for '{column['name']}'"})
+        bad |= failed
+    invalid.sort(key=lambda item: item["line"])
+    return frame[~bad.to_numpy()].reset_index(drop=True)
+
+def append_dataset_rows(dataset_path, raw, filename="", content_type=None):
+    dataset_path = Path(dataset_path)
+    frame, lines, invalid = parse_append_batch(raw, filename, content_type)
+    cache_dir = dataset_cache_dir(dataset_path)
+
+    with dataset_cache_lock(dataset_path):
+        meta = load_dataset_meta(dataset_path)
+        if frame.empty and not invalid:
+            raise HTTPException(status_code=400, detail="No rows to append")
+        valid = validate_append_batch(meta, frame, lines, invalid) if not frame.empty else frame
+        profile = None
+
+        pool = None
+        if len(valid):
+            profile = load_stored_profile(dataset_path, meta["content_hash"])
+            pool = load_example_pool(dataset_path, meta["content_hash"])
+
+            # Raw strings go to the CSV; empty fields are nulls in the column files
+            out = io.StringIO()
+            csv.writer(out, delimiter=meta["sep"], lineterminator="\n").writerows(valid.itertuples(index=False))
+            payload = out.getvalue().encode("utf-8")
+            with open(dataset_path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+                f.write(payload)
+
+            nulled = valid.where(valid != "", None)
+            batch = {}
+            for column in meta["columns"]:
+                encoded = encode_column(column, nulled[column["name"]])
+                column.pop("known", None)
+                path = cache_dir / column["file"]
+                with open(path, "ab") as f:
+                    f.truncate(meta["rows"] * encoded.itemsize)  # drop leftovers of an interrupted append
+                    encoded.tofile(f)
+                batch[column["name"]] = encoded
+
+            meta["rows"] += len(valid)
+            meta["source"] = file_signature(dataset_path)
+            meta["content_hash"] = hashlib.sha1(meta["content_hash"].encode() + payload).hexdigest()
+            write_dataset_meta(cache_dir, meta)
+            for index_file in list(cache_dir.glob("*.order")) + list(cache_dir.glob("*.sorted")):
+                index_file.unlink(missing_ok=True)
+
+            if profile is not None:
+                profile = update_dataset_profile(profile, meta, batch)
+                write_dataset_profile(dataset_path, profile)
+            if pool is not None:
+                pool = update_example_pool(pool, meta, batch)
+                write_example_pool(dataset_path, pool)
+
+    if profile is not None:
+        remember_dataset_profile(dataset_path, profile)
+    else:
+        forget_dataset_profile(dataset_path)
+    remember_example_pool(dataset_path, pool)
+
+    return {
+        "message": "Rows appended successfully" if len(valid) else "No valid rows to append",
+        "appended_rows": int(len(valid)),
+        "invalid_rows": len(invalid),
+        "invalid_samples": invalid[:APPEND_MAX_INVALID_SAMPLES],
+        "rows": meta["rows"],
+        "content_hash": meta["content_hash"],
+    }
+
+@app.post("/pulse/datasets/append/{dataset_name}", tags=["PUEDatasets"])
+async def append_dataset(dataset_name: str, file: UploadFile = File(...)):
+    dataset_path = DATASETS_FOLDER / dataset_name
+    if not dataset_path.exists():
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    raw = await file.read()
+    return await run_in_threadpool(append_dataset_rows, dataset_path, raw, file.filename or "", file.content_type)
+
+# Filter engine: the whole filter tree is compiled into one boolean mask over the cached
+# columns; range predicates on large columns are answered from a sorted index
+FILTER_INDEX_MIN_ROWS = 100000
+FILTER_MAX_LIMIT = 10000
+FILTER_RANGE_OPERATORS = {">", ">=", "<", "<=", "==", "between"}
+FILTER_OPERATORS = FILTER_RANGE_OPERATORS | {"!=", "in", "not_in"}
+NAT_INT64 = np.iinfo(np.int64).min
+
+def sorted_column_index(dataset_path, meta, column):
+    # Persistent argsort of a column (c<i>.order) plus the sorted values (c<i>.sorted);
+    # rebuilt whenever its length no longer matches the cached column
+    cache_dir = dataset_cache_dir(dataset_path)
+    stem = column["file"].rsplit(".", 1)[0]
+    order_path, sorted_path = cache_dir / f"{stem}.order", cache_dir / f"{stem}.sorted"
+    dtype = np.float64 if column["kind"] == "numeric" else np.int64
+    rows = meta["rows"]
+
+    with dataset_cache_lock(dataset_path):
+        if not (order_path.exists() and order_path.stat().st_size == rows * 8
+                and sorted_path.exists() and sorted_path.stat().st_size == rows * 8):
+            values = np.fromfile(cache_dir / column["file"], dtype=dtype, count=rows)
+            order = np.argsort(values, kind="stable")
+            for path, data in ((order_path, order), (sorted_path, values[order])):
+                tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+                data.tofile(tmp_path)
+                os.replace(tmp_path, path)
+
+    order = np.memmap(order_path, dtype=np.int64, mode="r", shape=(rows,))
+    values = np.memmap(sorted_path, dtype=dtype, mode="r", shape=(rows,))
+    if column["kind"] == "numeric":
+        valid = (0, int(np.searchsorted(values, np.nan, side="left")))  # NaN sorts last
+    else:
+        valid = (int(np.searchsorted(values, NAT_INT64, side="right")), rows)  # NaT sorts first
+    return order, values, valid
+
+def coerce_filter_value(column, value):
+    try:
+        if column["kind"] == "numeric":
+            return float(value)
+        if column["kind"] == "datetime":
+            ts = pd.Timestamp(value)
+            if ts.tzinfo is not None:
+                ts = ts.tz_convert(None)
+            return ts.as_unit("ns").value
+        return str(value)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid value {value!r} for column '{column['name']}': {e}")
+
+class FilterCompiler:
+    def __init__(self, dataset_path, meta):
+        self.dataset_path = dataset_path
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.columns = {c["name"]: c for c in meta["columns"]}
+        self.indexed = []
+
+    def compile(self, node):
+        if isinstance(node, list):
+            node = {"and": node}
+        for logic in ("and", "or"):
+            if logic in node:
+                if not isinstance(node[logic], list):
+                    raise HTTPException(status_code=400, detail=f"'{logic}' expects a list of filters")
+                masks = [self.compile(child) for child in node[logic]]
+                if not masks:
+                    return np.ones(self.rows, dtype=bool)
+                reduce = np.logical_and if logic == "and" else np.logical_or
+                return reduce.reduce(masks)
+        if "not" in node:
+            return ~self.compile(node["not"])
+        return self.predicate(node)
+
+    def predicate(self, node):
+        try:
+            name, operator, value = node["column"].strip().lower(), node["operator"], node.get("value")
+        except (KeyError, AttributeError):
+            raise HTTPException(status_code=400, detail=f"Invalid filter {node!r}")
+        if name not in self.columns:
+            raise HTTPException(status_code=400, detail=f"Unknown column '{name}'")
+        if operator not in FILTER_OPERATORS:
+            raise HTTPException(status_code=400, detail=f"Unsupported operator {operator}")
+        column = self.columns[name]
+
+        if operator in ("in", "not_in"):
+            values = value if isinstance(value, list) else [value]
+            mask = self.membership(column, values)
+            return mask if operator == "in" else ~mask
+        if operator == "between":
+            if not isinstance(value, list) or len(value) != 2:
+                raise HTTPException(status_code=400, detail="'between' expects [low, high]")
+            bounds = [coerce_filter_value(column, v) for v in value]
+        else:
+            bounds = coerce_filter_value(column, value)
+        if operator == "!=":
+            return ~self.comparison(column, "==", bounds)
+        return self.comparison(column, operator, bounds)
+
+    def membership(self, column, values):
+        data = open_dataset_column(self.dataset_path, self.meta, column)
+        if column["kind"] == "category":
+            lookup = pd.Index(column["categories"]).get_indexer([str(v) for v in values])
+            return np.isin(data, lookup[lookup >= 0])
+        return np.isin(data, [coerce_filter_value(column, v) for v in values])
+
+    def comparison(self, column, operator, value):
+        if column["kind"] == "category":
+            if operator != "==":
+                raise HTTPException(status_code=400, detail=f"Operator {operator} not supported for column '{column['name']}'")
+            return self.membership(column, [value])
+        if self.rows >= FILTER_INDEX_MIN_ROWS:
+            return self.indexed_range(column, operator, value)
+
+        data = open_dataset_column(self.dataset_path, self.meta, column)
+        if operator == "between":
+            mask = (data >= value[0]) & (data <= value[1])
+        else:
+            mask = {
+                ">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal, "==": np.equal,
+            }[operator](data, value)
+        if column["kind"] == "datetime":
+            mask &= data != NAT_INT64
+        return mask
+
+    def indexed_range(self, column, operator, value):
+        order, values, (first, last) = sorted_column_index(self.dataset_path, self.meta, column)
+        self.indexed.append(column["name"])
+        if operator == "between":
+            lo, hi = np.searchsorted(values, value[0], "left"), np.searchsorted(values, value[1], "right")
+        else:
+            lo, hi = {
+                ">": (np.searchsorted(values, value, "right"), last),
+                ">=": (np.searchsorted(values, value, "left"), last),
+                "<": (first, np.searchsorted(values, value, "left")),
+                "<=": (first, np.searchsorted(values, value, "right")),
+                "==": (np.searchsorted(values, value, "left"), np.searchsorted(values, value, "right")),
+            }[operator]
+        lo, hi = max(int(lo), first), min(int(hi), last)
+        mask = np.zeros(self.rows, dtype=bool)
+        if hi > lo:
+            mask[order[lo:hi]] = True
+        return mask
+
+def gather_rows(dataset_path, meta, names, row_ids):
+    columns = {c["name"]: c for c in meta["columns"]}
+    data = {}
+    for name in names:
+        column = columns[name]
+        values = np.asarray(open_dataset_column(dataset_path, meta, column)[row_ids])
+        if column["kind"] == "datetime":
+            data[name] = values.view("datetime64[ns]")
+        elif column["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(values, categories=column["categories"])
+        else:
+            data[name] = values
+    return pd.DataFrame(data, index=row_ids, columns=names)
+
+def json_records(frame):
+    # NaN/NaT become null so pages with missing values stay valid JSON
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+def aggregate_rows(dataset_path, meta, row_ids, group_by, aggregate):
+    numeric = {c["name"] for c in meta["columns"] if c["kind"] == "numeric"}
+    targets = [c for c in (aggregate or sorted(numeric)) if c in numeric and c != group_by]
+    frame = gather_rows(dataset_path, meta, ([group_by] if group_by else []) + targets, row_ids)
+    if not group_by:
+        return [{"count": len(frame), "mean": {c: finite_or_none(frame[c].mean()) for c in targets}}]
+
+    grouped = frame.groupby(group_by, observed=True, dropna=False)
+    counts = grouped.size()
+    means = grouped[targets].mean() if targets else pd.DataFrame(index=counts.index)
+    groups = []
+    for i, (key, count) in enumerate(counts.items()):
+        if pd.isna(key):
+            key = None
+        elif isinstance(key, pd.Timestamp):
+            key = key.isoformat()
+        elif not isinstance(key, str):
+            key = finite_or_none(key)
+        groups.append({group_by: key, "count": int(count), "mean": {c: finite_or_none(means[c].iloc[i]) for c in targets}})
+    return groups
+
 class FilterRequest(BaseModel):
     dataset_name: str
-    filters: List[dict] 
+    filters: List[dict] = []
+    offset: int = 0
+    limit: int = 100
+    cursor: Optional[str] = None
+    columns: Optional[List[str]] = None
+    group_by: Optional[str] = None
+    aggregate: Optional[List[str]] = None
+
+def run_filter(request: FilterRequest, dataset_path):
+    meta = get_dataset_meta(dataset_path)
+    names = [c["name"] for c in meta["columns"]]
+    projection = [c.strip().lower() for c in request.columns] if request.columns else names
+    unknown = [c for c in projection + [request.group_by or names[0]] + (request.aggregate or []) if c not in names]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {unknown}")
+    limit = min(max(request.limit, 0), FILTER_MAX_LIMIT)
+
+    compiler = FilterCompiler(dataset_path, meta)
+    row_ids = np.flatnonzero(compiler.compile(request.filters))
+
+    # Cursors are the id of the last row returned, so pages stay stable while paging forward
+    if request.cursor is not None:
+        try:
+            start = int(np.searchsorted(row_ids, int(request.cursor), side="right"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        start = max(request.offset, 0)
+    page = row_ids[start:start + limit]
+    has_more = start + len(page) < len(row_ids)
+
+    result = {
+        "filtered_sample": json_records(gather_rows(dataset_path, meta, projection, page)),
+        "total_rows": int(len(row_ids)),
+        "offset": start,
+        "limit": limit,
+        "next_cursor": str(int(page[-1])) if has_more and len(page) else None,
+        "columns": projection,
+        "indexed_columns": sorted(set(compiler.indexed)),
+    }
+    if request.group_by or request.aggregate:
+        result["aggregates"] = aggregate_rows(dataset_path, meta, row_ids, request.group_by, request.aggregate)
+    return result
 
 @app.post("/pulse/datasets/filter", tags=["PUEDatasets"])
 async def filter_dataset(request: FilterRequest):
@@ -865,39 +3034,172 @@ async def filter_dataset(request: FilterRequest):
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    df = pd.read_csv(dataset_path, sep=';')
-
-    for f in request.filters:
-        column, operator, value = f["column"], f["operator"], f["value"]
-        if operator == ">":
-            df = df[df[column] > value]
-        elif operator == "<":
-            df = df[df[column] < value]
-        elif operator == "==":
-            df = df[df[column] == value]
-        elif operator == ">=":
-            df = df[df[column] >= value]
-        elif operator == "<=":
-            df = df[df[column] <= value]
-        elif operator == "!=":
-            df = df[df[column] != value]
+    return await run_in_threadpool(run_filter, request, dataset_path)
+
+# Downsampling: a fixed number of representative points per feature over a time range,
+# taken in time order from the timestamp column's sorted index
+DOWNSAMPLE_MAX_POINTS = 5000
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets; each bucket step is vectorized over the bucket
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y, threshold):
+    # Keeps the minimum and maximum of each of threshold/2 equal-count buckets
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    buckets = np.arange(n) * max(threshold // 2, 1) // n
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    picked = []
+    for reduce in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == reduce.reduceat(y, starts)[buckets])
+        picked.append(hits[np.r_[True, buckets[hits][1:] != buckets[hits][:-1]]])
+    return np.unique(np.concatenate(picked))
+
+def downsample_dataset(dataset_path, features, points, method, start, end):
+    meta = get_dataset_meta(dataset_path)
+    columns = {c["name"]: c for c in meta["columns"]}
+    time_column = columns.get("timestamp") if columns.get("timestamp", {}).get("kind") == "datetime" else None
+    time_column = time_column or next((c for c in meta["columns"] if c["kind"] == "datetime"), None)
+    if time_column is None:
+        raise HTTPException(status_code=400, detail="Dataset has no timestamp column")
+    unknown = [f for f in features if columns.get(f, {}).get("kind") != "numeric"]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not numeric columns: {unknown}")
+
+    order, times, (first, last) = sorted_column_index(dataset_path, meta, time_column)
+    lo = first if start is None else max(first, int(np.searchsorted(times, coerce_filter_value(time_column, start), "left")))
+    hi = last if end is None else min(last, int(np.searchsorted(times, coerce_filter_value(time_column, end), "right")))
+    row_ids = np.asarray(order[lo:hi]) if hi > lo else np.empty(0, dtype=np.int64)
+    x_all = np.asarray(times[lo:hi]) if hi > lo else np.empty(0, dtype=np.int64)
+
+    series = {}
+    for feature in features:
+        y = np.asarray(open_dataset_column(dataset_path, meta, columns[feature])[row_ids])
+        present = np.isfinite(y)
+        x, y = x_all[present], y[present]
+        if method == "lttb":
+            keep = lttb_indices(x.astype(np.float64), y, points)
         else:
-            raise HTTPException(status_code=400, detail=f"Unsupported operator {operator}")
+            keep = minmax_indices(y, points)
+        series[feature] = {
+            "x": np.datetime_as_string(x[keep].view("datetime64[ns]"), unit="s").tolist(),
+            "y": y[keep].tolist(),
+        }
 
-    filtered_sample = df.head(100).to_dict(orient="records")
     return {
-        "filtered_sample": filtered_sample,
-        "total_rows": len(df)
+        "time_column": time_column["name"],
+        "method": method,
+        "points": points,
+        "total_rows": int(len(row_ids)),
+        "start": np.datetime_as_string(x_all[0].view("datetime64[ns]"), unit="s").item() if len(x_all) else None,
+        "end": np.datetime_as_string(x_all[-1].view("datetime64[ns]"), unit="s").item() if len(x_all) else None,
+        "series": series,
     }
 
+@app.get("/pulse/datasets/downsample/{dataset_name}", tags=["PUEDatasets"])
+async def downsample(dataset_name: str, features: Optional[str] = None, points: int = 500, method: str = "lttb",
+                     start: Optional[str] = None, end: Optional[str] = None):
+    dataset_path = DATASETS_FOLDER / dataset_name
+    if not dataset_path.exists():
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if method not in ("lttb", "minmax"):
+        raise HTTPException(status_code=400, detail="method must be 'lttb' or 'minmax'")
+    points = min(max(points, 3), DOWNSAMPLE_MAX_POINTS)
+
+    if features:
+        selected = [f.strip().lower() for f in features.split(",") if f.strip()]
+    else:
+        # Default to the model's features plus the target
+        summary_path = Path(SUMMARY_FOLDER, f"{dataset_name.rsplit('.', 1)[0]}.json")
+        selected = []
+        if summary_path.exists():
+            with open(summary_path) as f:
+                selected = json.load(f).get("features", [])
+        selected = selected + ["pue"] if "pue" not in selected else selected
+
+    return await run_in_threadpool(downsample_dataset, dataset_path, selected, points, method, start, end)
+
+# Plot rendering runs in a small process pool so matplotlib never blocks the event loop;
+# PNGs are cached on disk per dataset version and feature set
+PLOT_WORKERS = int(os.getenv("PLOT_WORKERS", "2"))
+PLOT_QUEUE_SIZE = int(os.getenv("PLOT_QUEUE_SIZE", "8"))
+plot_executor = None
+plot_executor_lock = Lock()
+plot_slots = threading.BoundedSemaphore(PLOT_QUEUE_SIZE)
+plot_renders = {}
+
+def get_plot_executor():
+    global plot_executor
+    with plot_executor_lock:
+        if plot_executor is None:
+            # spawn keeps the workers free of TensorFlow and the app state
+            plot_executor = ProcessPoolExecutor(max_workers=PLOT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return plot_executor
+
+def reset_plot_executor():
+    global plot_executor
+    with plot_executor_lock:
+        if plot_executor is not None:
+            plot_executor.shutdown(wait=False, cancel_futures=True)
+        plot_executor = None
+
+def plot_cache_path(dataset_path, content_hash, features):
+    key = hashlib.sha1(json.dumps(features).encode()).hexdigest()[:16]
+    return dataset_cache_dir(dataset_path) / "plots" / f"{content_hash[:16]}_{key}.png"
+
+async def render_plot(cache_path, histograms):
+    cached = cache_path.exists()
+    if not cached:
+        # Identical concurrent requests share a single render
+        render = plot_renders.get(cache_path)
+        if render is None:
+            if not plot_slots.acquire(blocking=False):
+                raise HTTPException(status_code=503, detail="Plot renderer is busy, try again shortly")
+            loop = asyncio.get_running_loop()
+            render = loop.run_in_executor(get_plot_executor(), plot_worker.render_histogram_grid, histograms)
+            plot_renders[cache_path] = render
+            try:
+                try:
+                    png = await render
+                except BrokenProcessPool:
+                    reset_plot_executor()
+                    raise HTTPException(status_code=503, detail="Plot renderer restarted, try again")
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                for stale in cache_path.parent.glob(f"*_{cache_path.name.split('_', 1)[1]}"):
+                    stale.unlink(missing_ok=True)
+                tmp_path = cache_path.with_name(f"{cache_path.name}.{uuid4().hex}.tmp")
+                tmp_path.write_bytes(png)
+                os.replace(tmp_path, cache_path)
+                return png
+            finally:
+                plot_renders.pop(cache_path, None)
+                plot_slots.release()
+        return await asyncio.shield(render)
+    return cache_path.read_bytes()
+
 @app.get("/pulse/datasets/plots/{dataset_name}", tags=["PUEDatasets"])
-async def generate_plots(dataset_name: str):
+async def generate_plots(dataset_name: str, format: str = "png"):
     dataset_path = Path("datasets") / dataset_name
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail="Dataset not found")
-
-    # Read dataset
-    df = pd.read_csv(dataset_path, sep=';')
+    if format not in ("png", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'png' or 'json'")
 
     # Determine associated model
     model_name = dataset_name.rsplit('.', 1)[0]
@@ -911,27 +3213,19 @@ async def generate_plots(dataset_name: str):
         summary_data = json.load(f)
     features = summary_data.get("features", [])
 
-    # Select numeric vars from the dataset
-    numeric_df = df.select_dtypes(include=['number'])
-    numeric_df = numeric_df[[col for col in features if col in numeric_df.columns]]
-
-    buf = io.BytesIO()
+    # Histogram bins of the numeric feature columns come from the dataset profile
+    profile = await run_in_threadpool(get_dataset_profile, dataset_path)
+    histograms = {
+        col: profile["columns"][col]["histogram"]
+        for col in features
+        if col in profile["numeric"] and "histogram" in profile["columns"][col]
+    }
 
-    if numeric_df.empty:
-        fig, ax = plt.subplots(figsize=(15, 15))
-        ax.text(0.5, 0.5, 'No numerical columns available to plot.', 
-                horizontalalignment='center', verticalalignment='center', 
-                fontsize=12, transform=ax.transAxes)
-        ax.set_axis_off()
-        plt.tight_layout()
-    else:
-        axes = numeric_df.hist(figsize=(15, 15))
-        plt.tight_layout(pad=2.0)
+    if format == "json":
+        return {"content_hash": profile["content_hash"], "histograms": histograms}
 
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    histogram_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close('all')
+    png = await render_plot(plot_cache_path(dataset_path, profile["content_hash"], features), histograms)
+    histogram_base64 = base64.b64encode(png).decode('utf-8')
 
     return {"histogram": histogram_base64}
 
@@ -939,7 +3233,16 @@ async def generate_plots(dataset_name: str):
 df = None
 precomputed_correlation = ""
 descriptions = []
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+embedding_model = None
+embedding_model_lock = Lock()
+
+def get_embedding_model():
+    # Loaded on first use so training workers importing this module skip it
+    global embedding_model
+    with embedding_model_lock:
+        if embedding_model is None:
+            embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        return embedding_model
 index = None
 active_model_name = None
 
@@ -956,25 +3259,27 @@ def load_dataset_once():
     if not model_name:
         raise ValueError("No default model set in configuration.")
 
-    if model_name == active_model_name:
-        return  # Already loaded
-
     dataset_path = DATASETS_FOLDER / f"{model_name}.csv"
     if not dataset_path.exists():
         raise FileNotFoundError(f"Dataset file '{dataset_path}' not found.")
 
-    df_local = pd.read_csv(dataset_path, sep=";")
+    profile = get_dataset_profile(dataset_path)
+    if active_model_name == (model_name, profile["content_hash"]):
+        return  # Already loaded
+
+    df_local = read_dataset(dataset_path)
 
-    # Precompute correlation and descriptions
-    precomputed = df_local.corr(numeric_only=True)['pue'].sort_values(ascending=False).to_string()
+    # Correlation and descriptions come from the precomputed profile
+    precomputed = pd.Series(profile["correlation"].get('pue', {}), dtype=float).sort_values(ascending=False).to_string()
+    describe = profile_describe(profile)
     descs = []
-    for col in df_local.columns:
+    for col in profile["columns"]:
         if col != "timestamp":
-            values = df_local[col].describe().to_dict()
+            values = {k: v for k, v in describe.get(col, {}).items() if v is not None}
             desc = f"Column '{col}' has mean {values.get('mean', 0):.2f}, std {values.get('std', 0):.2f}, min {values.get('min', 0):.2f}, max {values.get('max', 0):.2f}"
             descs.append(desc)
 
-    embeds = embedding_model.encode(descs, show_progress_bar=True)
+    embeds = get_embedding_model().encode(descs, show_progress_bar=True)
     idx = faiss.IndexFlatL2(embeds.shape[1])
     idx.add(np.array(embeds))
 
@@ -983,7 +3288,7 @@ def load_dataset_once():
     precomputed_correlation = precomputed
     descriptions[:] = descs
     index = idx
-    active_model_name = model_name
+    active_model_name = (model_name, profile["content_hash"])
 
 # Request structure
 class AskRequest(BaseModel):
@@ -1011,7 +3316,7 @@ async def ask_question(body: AskRequest):
 
     language_instruction = "Respond in English." if lang != "es" else "Responde en español."
 
-    question_embedding = embedding_model.encode([query])
+    question_embedding = get_embedding_model().encode([query])
     distances, indices = index.search(np.array(question_embedding), 3)
     retrieved_chunks = [descriptions[i] for i in indices[0]]
     context = "\n".join(retrieved_chunks)
@@ -1070,7 +3375,7 @@ Please answer the following question:
                 stream=True,
                 timeout=120
             )
-            update_llm_stats()
+            usage_stats.record_llm_question(model_name)
             for line in response.iter_lines():
                 if line:
                     try:
@@ -1085,7 +3390,7 @@ Please answer the following question:
             yield json.dumps({"response": f"[Error]: {str(e)}"}) + "\n"
         finally:
             # Register the interaction
-            log_llm_interaction_to_summary(query, full_response, model, model_name)
+            log_llm_interaction(query, full_response, model, model_name)
 
 
     if not stream:
@@ -1100,79 +3405,222 @@ Please answer the following question:
         full_response = ''.join(chunks)
     
         # Register the interaction
-        log_llm_interaction_to_summary(query, full_response, model, model_name)
+        log_llm_interaction(query, full_response, model, model_name)
         
         return JSONResponse(content={"response": ''.join(chunks)})
 
     return StreamingResponse(generate(), media_type="application/json")
 
-def log_llm_interaction_to_summary(query: str, response: str, model: str, model_name: str):
-    summary_path = Path(SUMMARY_FOLDER) / f"{model_name}.json"
-    if not summary_path.exists():
+def log_llm_interaction(query: str, response: str, model: str, model_name: str):
+    if not Path(SUMMARY_FOLDER, f"{model_name}.json").exists():
         return
 
-    try:
-        with open(summary_path, "r", encoding="utf-8") as f:
-            summary = json.load(f)
-    except Exception:
-        summary = {}
-
-    entry = {
+    history_store.add(model_name, "llm", {
         "timestamp": datetime.now().isoformat(),
         "query": query,
         "response": response,
         "ollama_model": model
-    }
-
-    summary.setdefault("llm_history", []).append(entry)
-
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
-
-
-# Statistics update
-def update_llm_stats():
-    stats_path = Path(CONFIG_PATH, STATISTICS_FILE)
-    Path(CONFIG_PATH).mkdir(parents=True, exist_ok=True)
-
-    stats = {
-        "predictions_per_month": {},
-        "llm_questions": 0
-    }
-
-    if Path(stats_path):
-        try:
-            with open(stats_path, "r") as f:
-                content = f.read()
-                if content.strip():
-                    stats = json.loads(content)
-        except Exception:
-            pass
-
-    stats["llm_questions"] = stats.get("llm_questions", 0) + 1
+    })
 
-    with open(stats_path, "w") as f:
-        json.dump(stats, f, indent=2)
 
 # HISTORY
+HISTORY_DB = Path(CONFIG_PATH, "history.db")
+HISTORY_KINDS = {"Simulation": "simulation", "LLM": "llm"}
+
+class HistoryStore:
+    # Simulations and LLM interactions live in SQLite instead of the summary JSON:
+    # appends and deletes are indexed, reads can be paginated by cursor (row id) and time range
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._migrated = set()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model_name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                item_id INTEGER,
+                timestamp TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_model_ts ON history (model_name, kind, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_history_model_item ON history (model_name, kind, item_id);
+            CREATE TABLE IF NOT EXISTS migrated_summaries (model_name TEXT PRIMARY KEY);
+        """)
+        self._conn.commit()
+
+    def _ensure_migrated(self, model_name):
+        # One-time import of the lists that older versions kept inside summaries/<model>.json
+        if model_name in self._migrated:
+            return
+        done = self._conn.execute("SELECT 1 FROM migrated_summaries WHERE model_name = ?", (model_name,)).fetchone()
+        if not done:
+            summary_path = Path(SUMMARY_FOLDER, f"{model_name}.json")
+            summary = None
+            if summary_path.exists():
+                try:
+                    with open(summary_path, "r", encoding="utf-8") as f:
+                        summary = json.load(f)
+                except Exception:
+                    summary = None
+            if summary is not None:
+                rows = [("simulation", s) for s in summary.get("simulations", [])]
+                rows += [("llm", q) for q in summary.get("llm_history", []) + summary.get("llm_questions", [])]
+                self._conn.executemany(
+                    "INSERT INTO history (model_name, kind, item_id, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                    [(model_name, kind, entry.get("id"), entry.get("timestamp", ""), json.dumps(entry)) for kind, entry in rows],
+                )
+                if rows:
+                    for key in ("simulations", "llm_history", "llm_questions"):
+                        summary.pop(key, None)
+                    tmp_path = summary_path.with_suffix(".json.tmp")
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(summary, f, indent=2)
+                    os.replace(tmp_path, summary_path)
+            self._conn.execute("INSERT OR IGNORE INTO migrated_summaries (model_name) VALUES (?)", (model_name,))
+            self._conn.commit()
+        self._migrated.add(model_name)
+
+    def add(self, model_name, kind, entry):
+        with self._lock:
+            self._ensure_migrated(model_name)
+            if kind == "simulation" and entry.get("id") is None:
+                last = self._conn.execute(
+                    "SELECT MAX(item_id) FROM history WHERE model_name = ? AND kind = ?", (model_name, kind)
+                ).fetchone()[0]
+                entry = {"id": (last or 0) + 1, **entry}
+            self._conn.execute(
+                "INSERT INTO history (model_name, kind, item_id, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                (model_name, kind, entry.get("id"), entry["timestamp"], json.dumps(entry)),
+            )
+            self._conn.commit()
+        return entry
+
+    def query(self, model_name, kind=None, since=None, until=None, cursor=None, limit=None, descending=False):
+        sql = "SELECT id, kind, payload FROM history WHERE model_name = ?"
+        params = [model_name]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if since:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        if until:
+            sql += " AND timestamp <= ?"
+            params.append(until)
+        if cursor is not None:
+            sql += " AND id < ?" if descending else " AND id > ?"
+            params.append(cursor)
+        sql += " ORDER BY id DESC" if descending else " ORDER BY id ASC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._ensure_migrated(model_name)
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(row_id, row_kind, json.loads(payload)) for row_id, row_kind, payload in rows]
+
+    def list(self, model_name, kind):
+        return [entry for _, _, entry in self.query(model_name, kind)]
+
+    def delete(self, model_name, kind=None, item_id=None, timestamp=None):
+        sql = "DELETE FROM history WHERE model_name = ?"
+        params = [model_name]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if item_id is not None:
+            sql += " AND item_id = ?"
+            params.append(item_id)
+        if timestamp is not None:
+            sql += " AND timestamp = ?"
+            params.append(timestamp)
+        with self._lock:
+            self._ensure_migrated(model_name)
+            deleted = self._conn.execute(sql, params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def drop_model(self, model_name):
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE model_name = ?", (model_name,))
+            self._conn.execute("DELETE FROM migrated_summaries WHERE model_name = ?", (model_name,))
+            self._conn.commit()
+            self._migrated.discard(model_name)
+
+    def checkpoint(self):
+        # Folds the WAL into the main file so the .db can be copied as-is
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM history")
+            self._conn.execute("DELETE FROM migrated_summaries")
+            self._conn.commit()
+            self._migrated.clear()
+
+history_store = HistoryStore(HISTORY_DB)
+
+def split_history(rows):
+    simulations = [entry for _, kind, entry in rows if kind == "simulation"]
+    llm_questions = [entry for _, kind, entry in rows if kind == "llm"]
+    return simulations, llm_questions
+
 @app.get("/pulse/history/{model_name}", tags=["PUEHistory"])
-def get_model_history(model_name: str):
+def get_model_history(
+    model_name: str,
+    type: str = None,
+    since: str = None,
+    until: str = None,
+    cursor: int = None,
+    limit: int = None,
+    order: str = "asc"
+):
     summary_path = SUMMARY_FOLDER / f"{model_name}.json"
 
     if not summary_path.exists():
         raise HTTPException(status_code=404, detail="Model summary not found")
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    if type is not None and type not in HISTORY_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown history type '{type}'.")
 
-    simulations = data.get("simulations", [])
-    llm_questions = data.get("llm_questions", []) or data.get("llm_history", [])
+    rows = history_store.query(
+        model_name, HISTORY_KINDS.get(type), since, until, cursor, limit, descending=order == "desc"
+    )
+    simulations, llm_questions = split_history(rows)
 
     return {
         "simulations": simulations,
         "llm_questions": llm_questions,
+        "next_cursor": rows[-1][0] if limit and len(rows) == limit else None,
     }
 
+@app.get("/pulse/history/{model_name}/export", tags=["PUEHistory"])
+def export_model_history(model_name: str, type: str = None, since: str = None, until: str = None):
+    if type is not None and type not in HISTORY_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown history type '{type}'.")
+
+    def history_generator():
+        cursor = None
+        while True:
+            rows = history_store.query(model_name, HISTORY_KINDS.get(type), since, until, cursor, 1000)
+            for row_id, kind, entry in rows:
+                yield json.dumps({"cursor": row_id, "type": "Simulation" if kind == "simulation" else "LLM", **entry}) + "\n"
+            if len(rows) < 1000:
+                break
+            cursor = rows[-1][0]
+
+    return StreamingResponse(
+        history_generator(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={model_name}_history.ndjson"},
+    )
+
 @app.delete("/pulse/history/clear_llm/{model_name}", tags=["PUEHistory"])
 def clear_llm_history(model_name: str):
     summary_path = Path(SUMMARY_FOLDER) / f"{model_name}.json"
@@ -1180,17 +3628,7 @@ def clear_llm_history(model_name: str):
     if not summary_path.exists():
         raise HTTPException(status_code=404, detail="Model summary not found.")
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        summary = json.load(f)
-
-    if "llm_history" in summary:
-        summary["llm_history"] = []
-
-    if "llm_questions" in summary:
-        summary["llm_questions"] = []
-
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+    history_store.delete(model_name, "llm")
 
     return {"message": f"LLM history cleared for model '{model_name}'."}
 
@@ -1201,14 +3639,7 @@ def clear_simulations_history(model_name: str):
     if not summary_path.exists():
         raise HTTPException(status_code=404, detail="Model summary not found.")
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        summary = json.load(f)
-
-    if "simulations" in summary:
-        summary["simulations"] = []
-
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
+    history_store.delete(model_name, "simulation")
 
     return {"message": f"Simulations cleared for model '{model_name}'."}
 
@@ -1227,27 +3658,13 @@ def delete_history_item(
     if not summary_path.exists():
         raise HTTPException(status_code=404, detail="Model summary not found.")
 
-    with open(summary_path, "r", encoding="utf-8") as f:
-        summary = json.load(f)
-
-    key_map = {
-        "Simulation": "simulations",
-        "LLM": "llm_history" if "llm_history" in summary else "llm_questions"
-    }
-
-    key = key_map.get(action_type)
-    if key not in summary or not isinstance(summary[key], list):
+    kind = HISTORY_KINDS.get(action_type)
+    if kind is None:
         raise HTTPException(status_code=404, detail=f"No {action_type} entries found.")
 
-    original_len = len(summary[key])
-    summary[key] = [entry for entry in summary[key] if entry.get("timestamp") != timestamp]
-
-    if len(summary[key]) == original_len:
+    if not history_store.delete(model, kind, timestamp=timestamp):
         raise HTTPException(status_code=404, detail="Item not found.")
 
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
-
     return {"message": f"{action_type} item deleted from model '{model}'."}
 
 # SETTINGS
@@ -1281,12 +3698,26 @@ def delete_all_models():
 
     for folder, pattern in folders:
         for file in folder.glob(pattern):
+            if not file.is_file():
+                continue
             try:
                 file.unlink()
                 deleted.append(str(file))
             except Exception as e:
                 errors.append(f"Error deleting {file}: {str(e)}")
 
+    model_cache.clear()
+    history_store.clear()
+    with dataset_profiles_lock:
+        dataset_profiles.clear()
+    with example_pools_lock:
+        example_pools.clear()
+    if DATASET_CACHE_FOLDER.exists():
+        shutil.rmtree(DATASET_CACHE_FOLDER, ignore_errors=True)
+    if MODEL_VERSIONS_FOLDER.exists():
+        shutil.rmtree(MODEL_VERSIONS_FOLDER, ignore_errors=True)
+        deleted.append(str(MODEL_VERSIONS_FOLDER))
+
     config_path = CONFIG_PATH
     if config_path.exists():
         try:
@@ -1300,10 +3731,13 @@ def delete_all_models():
 
 @app.get("/pulse/settings/download_all", tags=["PUESettings"])
 def download_all_models():
+    history_store.checkpoint()
+
     folders = [
         (MODEL_FOLDER, "*"),
         (DATASETS_FOLDER, "*.csv"),
         (SUMMARY_FOLDER, "*.json"),
+        (CONFIG_PATH, HISTORY_DB.name),
     ]
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp:
@@ -1321,19 +3755,118 @@ def download_all_models():
 
 
 # STATS
+STATISTICS_FLUSH_SECONDS = float(os.getenv("STATISTICS_FLUSH_SECONDS", "10"))
+
+class UsageStatistics:
+    # In-memory usage counters, flushed periodically to .config/statistics.json with an atomic rename
+    def __init__(self, path, flush_interval):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._lock = Lock()
+        self._dirty = False
+        self._stats = self._load()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        stats = {}
+        try:
+            with open(self.path, "r") as f:
+                content = f.read()
+                if content.strip():
+                    stats = json.loads(content)
+        except Exception:
+            pass
+        stats.setdefault("predictions_per_month", {})
+        stats.setdefault("predictions_per_day", {})
+        stats.setdefault("predictions_per_model", {})
+        stats.setdefault("requests_per_endpoint", {})
+        stats.setdefault("llm_questions", 0)
+        stats.setdefault("llm_questions_per_model", {})
+        return stats
+
+    def record_prediction(self, model_name: str, endpoint: str, count: int = 1):
+        now = datetime.now()
+        month, day = now.strftime("%Y-%m"), now.strftime("%Y-%m-%d")
+        with self._lock:
+            s = self._stats
+            s["predictions_per_month"][month] = s["predictions_per_month"].get(month, 0) + count
+            s["predictions_per_day"][day] = s["predictions_per_day"].get(day, 0) + count
+            s["predictions_per_model"][model_name] = s["predictions_per_model"].get(model_name, 0) + count
+            s["requests_per_endpoint"][endpoint] = s["requests_per_endpoint"].get(endpoint, 0) + 1
+            self._dirty = True
+
+    def record_llm_question(self, model_name: str):
+        with self._lock:
+            s = self._stats
+            s["llm_questions"] += 1
+            s["llm_questions_per_model"][model_name] = s["llm_questions_per_model"].get(model_name, 0) + 1
+            s["requests_per_endpoint"]["llm_ask"] = s["requests_per_endpoint"].get("llm_ask", 0) + 1
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self._stats, indent=2)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            with self._lock:
+                self._dirty = True
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+usage_stats = UsageStatistics(Path(CONFIG_PATH, STATISTICS_FILE), STATISTICS_FLUSH_SECONDS)
+
+@app.on_event("shutdown")
+def flush_usage_statistics():
+    usage_stats.close()
+    training_scheduler.shutdown()
+    automl_candidates.close()
+    if plot_executor is not None:
+        plot_executor.shutdown(cancel_futures=True)
+
 @app.get("/pulse/statistics", tags=["PUEStatistics"])
 def get_statistics():
-    stats_path = Path(CONFIG_PATH, STATISTICS_FILE)
-    if Path(stats_path):
-        with open(stats_path, "r") as f:
-            return json.load(f)
-    else:
-        return {"predictions_per_month": {}, "llm_questions": 0}
-    
+    return usage_stats.snapshot()
+
+@app.get("/pulse/statistics/model_cache", tags=["PUEStatistics"])
+def get_model_cache_statistics():
+    return model_cache.stats()
+
+@app.get("/pulse/statistics/inference_queue", tags=["PUEStatistics"])
+def get_inference_queue_statistics():
+    return inference_batcher.stats()
+
+@app.get("/pulse/statistics/progress_bus", tags=["PUEStatistics"])
+def get_progress_bus_statistics():
+    return progress_bus.stats()
+
+@app.get("/pulse/statistics/automl_candidates", tags=["PUEStatistics"])
+def get_automl_candidate_statistics():
+    return automl_candidates.stats()
+
 @app.get("/pulse/statistics/dashboard", tags=["PUEStatistics"])
 def get_dashboard_statistics():
-    stats_path = Path(CONFIG_PATH, STATISTICS_FILE)
-
     models = []
     r2_list = []
 
@@ -1351,17 +3884,8 @@ def get_dashboard_statistics():
                 except Exception:
                     continue
 
-    # Load global usage statistics
-    stats = {
-        "predictions_per_month": {},
-        "llm_questions": 0
-    }
-    if Path(stats_path):
-        try:
-            with open(stats_path, "r") as f:
-                stats = json.load(f)
-        except Exception:
-            pass
+    # Global usage statistics (served from memory)
+    stats = usage_stats.snapshot()
 
     # Calculate total predictions across all months
     total_predictions = sum(stats.get("predictions_per_month", {}).values())
@@ -1374,6 +3898,9 @@ def get_dashboard_statistics():
         ],
         "total_predictions": total_predictions,
         "predictions_by_month": stats.get("predictions_per_month", {}),
+        "predictions_by_day": stats.get("predictions_per_day", {}),
+        "predictions_by_model": stats.get("predictions_per_model", {}),
+        "requests_by_endpoint": stats.get("requests_per_endpoint", {}),
         "llm_questions": stats.get("llm_questions", 0)
     }
 
@@ -1382,7 +3909,8 @@ def purge_orphan_files():
     deleted_files = []
     errors = []
     
-    # Temp files
+    # Unsaved AutoML candidates, then temp files
+    deleted_files.extend(f"candidate {temp_id}" for temp_id in automl_candidates.clear())
     tmp_folder = Path("temp_models")
     if tmp_folder.exists():
         for file in tmp_folder.glob("**/*"):
@@ -1414,11 +3942,18 @@ def purge_orphan_files():
                 except Exception as e:
                     errors.append(f"Error deleting {csv_file}: {str(e)}")
 
-    # Check models folder (.h5 and .gz)
+    # Check columnar dataset caches without a CSV
+    if DATASET_CACHE_FOLDER.exists():
+        for cache_dir in DATASET_CACHE_FOLDER.iterdir():
+            if cache_dir.is_dir() and not Path(DATASETS_FOLDER, f"{cache_dir.name}.csv").exists():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                deleted_files.append(str(cache_dir))
+
+    # Check models folder (.h5/.joblib and .gz)
     if Path(MODEL_FOLDER).exists():
         for model_file in Path(MODEL_FOLDER).glob("*"):
-            if model_file.suffix in [".h5", ".gz"]:
-                base_name = model_file.stem.replace("_scaler", "")
+            if model_file.suffix in [".h5", ".joblib", ".gz", ".npz"]:
+                base_name = model_file.stem.replace("_scaler", "").replace("_numpy", "")
                 if base_name not in valid_models:
                     try:
                         model_file.unlink()
@@ -1426,6 +3961,13 @@ def purge_orphan_files():
                     except Exception as e:
                         errors.append(f"Error deleting {model_file}: {str(e)}")
 
+    # Archived versions of deleted models
+    if MODEL_VERSIONS_FOLDER.exists():
+        for versions_dir in MODEL_VERSIONS_FOLDER.iterdir():
+            if versions_dir.is_dir() and versions_dir.name not in valid_models:
+                shutil.rmtree(versions_dir, ignore_errors=True)
+                deleted_files.append(str(versions_dir))
+
     return {
         "message": f"Purged orphaned files.",
         "deleted": deleted_files,
@@ -0,0 +1,133 @@
+# Trained model files and the NumPy inference engine for the generated Dense networks.
+# Kept free of the app imports so the training workers can save models without loading the API.
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import tensorflow as tf
+
+import training
+
+MODEL_FOLDER = Path("models")
+SUMMARY_FOLDER = Path("summaries")
+
+# Parity required between the NumPy engine and Keras before an exported artifact is used
+NUMPY_ENGINE_TOLERANCE = 1e-4
+
+NUMPY_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+
+class NumpyDenseModel:
+    # Pure NumPy forward pass: scaling + Dense layers, no TensorFlow needed at serving time
+    def __init__(self, mean, scale, weights, biases, activations):
+        self.mean = mean
+        self.scale = scale
+        self.weights = weights
+        self.biases = biases
+        self.activations = activations
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data["n_layers"])
+            return cls(
+                data["scaler_mean"],
+                data["scaler_scale"],
+                [data[f"W{i}"] for i in range(n_layers)],
+                [data[f"b{i}"] for i in range(n_layers)],
+                [str(a) for a in data["activations"]],
+            )
+
+    @property
+    def nbytes(self):
+        return sum(w.nbytes + b.nbytes for w, b in zip(self.weights, self.biases)) + self.mean.nbytes + self.scale.nbytes
+
+    def forward(self, X_scaled):
+        out = np.asarray(X_scaled, dtype=np.float32)
+        for W, b, activation in zip(self.weights, self.biases, self.activations):
+            out = NUMPY_ACTIVATIONS[activation](out @ W + b)
+        return out.reshape(-1)
+
+    def predict(self, X):
+        X_scaled = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        return self.forward(X_scaled)
+
+
+class SklearnModel:
+    # scikit-learn families (training.SKLEARN_FAMILIES) behind the same predict(X) as the NumPy engine
+    def __init__(self, scaler, estimator, nbytes):
+        self.scaler = scaler
+        self.estimator = estimator
+        self.nbytes = nbytes
+
+    def predict(self, X):
+        return training.predict(self.estimator, self.scaler.transform(np.asarray(X, dtype=np.float64)))
+
+
+def model_file(folder, base):
+    # Trained model of any family: <base>.joblib for scikit-learn, <base>.h5 for Keras
+    joblib_path = Path(folder, f"{base}.joblib")
+    return joblib_path if joblib_path.exists() else Path(folder, f"{base}.h5")
+
+
+def save_model_file(model, scaler, folder, base, engine_path):
+    # Writes the model in its family's format and drops the other family's files, so a retrained
+    # name never resolves to a stale model
+    if isinstance(model, tf.keras.Model):
+        model.save(Path(folder, f"{base}.h5"), include_optimizer=False)
+        export_numpy_artifact(model, scaler, engine_path)
+        stale = [Path(folder, f"{base}.joblib")]
+    else:
+        joblib.dump(model, Path(folder, f"{base}.joblib"))
+        stale = [Path(folder, f"{base}.h5"), Path(engine_path)]
+    for path in stale:
+        path.unlink(missing_ok=True)
+
+
+def export_numpy_artifact(model, scaler, path):
+    # Writes Dense weights + scaler stats to a .npz; returns False if the model is not a plain Dense stack
+    arrays = {}
+    activations = []
+    dense_layers = [layer for layer in model.layers if layer.weights]
+    for i, layer in enumerate(dense_layers):
+        if not isinstance(layer, tf.keras.layers.Dense):
+            return False
+        activation = layer.get_config().get("activation", "linear")
+        if activation not in NUMPY_ACTIVATIONS:
+            return False
+        kernel, bias = layer.get_weights()
+        arrays[f"W{i}"] = kernel.astype(np.float32)
+        arrays[f"b{i}"] = bias.astype(np.float32)
+        activations.append(activation)
+
+    engine = NumpyDenseModel(
+        np.asarray(scaler.mean_, dtype=np.float64),
+        np.asarray(scaler.scale_, dtype=np.float64),
+        [arrays[f"W{i}"] for i in range(len(activations))],
+        [arrays[f"b{i}"] for i in range(len(activations))],
+        activations,
+    )
+
+    # Parity check against Keras before the artifact is trusted for serving
+    probe = np.random.default_rng(0).normal(size=(64, len(scaler.mean_)))
+    keras_out = model.predict(probe, verbose=0).reshape(-1)
+    if not np.allclose(engine.forward(probe), keras_out, atol=NUMPY_ENGINE_TOLERANCE, rtol=NUMPY_ENGINE_TOLERANCE):
+        return False
+
+    tmp_path = Path(path).with_suffix(".tmp.npz")
+    np.savez(
+        tmp_path,
+        n_layers=np.array(len(activations)),
+        activations=np.array(activations),
+        scaler_mean=engine.mean,
+        scaler_scale=engine.scale,
+        **arrays,
+    )
+    os.replace(tmp_path, path)
+    return True
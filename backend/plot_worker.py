@@ -0,0 +1,47 @@
+# Histogram rendering for /pulse/datasets/plots, run inside a process pool.
+# Kept free of the app imports so spawned workers only load NumPy and matplotlib.
+import io
+import math
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+def grid_layout(n):
+    # Same grid pandas' DataFrame.hist uses
+    if n == 1:
+        return 1, 1
+    if n == 2:
+        return 1, 2
+    if n <= 4:
+        return 2, 2
+    cols = math.ceil(math.sqrt(n))
+    return math.ceil(n / cols), cols
+
+
+def render_histogram_grid(histograms, figsize=(15, 15)):
+    # histograms: {column: {"edges": [...], "counts": [...]}} -> PNG bytes
+    fig = Figure(figsize=figsize)
+
+    if not histograms:
+        ax = fig.add_subplot()
+        ax.text(0.5, 0.5, 'No numerical columns available to plot.',
+                horizontalalignment='center', verticalalignment='center',
+                fontsize=12, transform=ax.transAxes)
+        ax.set_axis_off()
+        fig.tight_layout()
+    else:
+        rows, cols = grid_layout(len(histograms))
+        axes = np.atleast_1d(fig.subplots(rows, cols)).ravel()
+        for ax, (name, hist) in zip(axes, histograms.items()):
+            edges = np.asarray(hist["edges"], dtype=float)
+            ax.bar(edges[:-1], hist["counts"], width=np.diff(edges), align="edge")
+            ax.set_title(name)
+            ax.grid(True)
+        for ax in axes[len(histograms):]:
+            ax.set_visible(False)
+        fig.tight_layout(pad=2.0)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
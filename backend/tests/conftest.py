@@ -0,0 +1,30 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(scope="session")
+def app_main(tmp_path_factory):
+    # main.py creates its folders, .env and .config in the working directory on import
+    workdir = tmp_path_factory.mktemp("app")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Datasets, models and caches use paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    Path("datasets").mkdir()
+    Path("models").mkdir()
+    return tmp_path
@@ -0,0 +1,21 @@
+import numpy as np
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import StandardScaler
+
+import cv_worker
+
+
+def test_fold_scalers_match_standard_scaler():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.normal(1000.0, 5.0, 503),  # large offset, small spread
+        rng.uniform(-1.0, 1.0, 503),
+        np.full(503, 7.0),  # constant column
+    ])
+    folds = [test_idx for _, test_idx in KFold(n_splits=5, shuffle=True, random_state=42).split(X)]
+
+    for test_idx, (mean, scale) in zip(folds, cv_worker.fold_scalers(X, folds)):
+        train = np.delete(X, test_idx, axis=0)
+        reference = StandardScaler().fit(train)
+        np.testing.assert_allclose(mean, reference.mean_, rtol=1e-12)
+        np.testing.assert_allclose(scale, reference.scale_, rtol=1e-9)
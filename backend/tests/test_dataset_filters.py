@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import build_dataset_cache
+
+FILTERS = [
+    [{"column": "pue", "operator": ">", "value": 1.5}],
+    [{"column": "pue", "operator": "<=", "value": 1.5}],
+    [{"column": "it_load", "operator": "between", "value": [120, 180]}],
+    [{"column": "it_load", "operator": "==", "value": 150}],
+    [{"column": "it_load", "operator": "!=", "value": 150}],
+    [{"column": "timestamp", "operator": ">=", "value": "2024-01-02 12:00:00"}],
+    [{"column": "timestamp", "operator": "<", "value": "2024-01-02 12:00:00"}],
+    {"or": [{"column": "pue", "operator": "<", "value": 1.3}, {"not": {"column": "site", "operator": "in", "value": ["a"]}}]},
+]
+
+
+@pytest.fixture
+def dataset(workdir):
+    rng = np.random.default_rng(0)
+    rows = 2000
+    frame = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=rows, freq="min").astype(str),
+        "it_load": rng.integers(100, 200, rows).astype(float),
+        "pue": rng.uniform(1.1, 1.9, rows).round(3),
+        "site": rng.choice(["a", "b"], rows),
+    })
+    frame.loc[rng.random(rows) < 0.05, "pue"] = np.nan
+    frame.loc[rng.random(rows) < 0.05, "timestamp"] = None
+    path = workdir / "datasets" / "filters.csv"
+    frame.to_csv(path, sep=";", index=False)
+    return path, build_dataset_cache(path)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_indexed_filter_matches_scan(app_main, dataset, filters, monkeypatch):
+    path, meta = dataset
+    scan = app_main.FilterCompiler(path, meta)
+    expected = scan.compile(filters)
+    assert not scan.indexed
+
+    monkeypatch.setattr(app_main, "FILTER_INDEX_MIN_ROWS", 0)
+    indexed = app_main.FilterCompiler(path, meta)
+    np.testing.assert_array_equal(indexed.compile(filters), expected)
+
+
+def test_sorted_index_excludes_missing_values(app_main, dataset):
+    path, meta = dataset
+    columns = {c["name"]: c for c in meta["columns"]}
+
+    order, values, (first, last) = app_main.sorted_column_index(path, meta, columns["pue"])
+    pue = app_main.open_dataset_column(path, meta, columns["pue"])
+    assert last - first == np.count_nonzero(~np.isnan(pue))
+    assert np.all(np.diff(values[first:last]) >= 0)
+    np.testing.assert_array_equal(pue[order[first:last]], values[first:last])
+
+    _, _, (first, last) = app_main.sorted_column_index(path, meta, columns["timestamp"])
+    timestamps = app_main.open_dataset_column(path, meta, columns["timestamp"])
+    assert last - first == np.count_nonzero(timestamps != app_main.NAT_INT64)
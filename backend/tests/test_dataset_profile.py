@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+
+def sample_matrix(rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 3))
+    X[:, 1] = 2.0 * X[:, 0] + rng.normal(scale=0.5, size=rows)
+    X[rng.random((rows, 3)) < 0.1] = np.nan
+    return X
+
+
+def test_merge_moments_matches_single_pass(app_main):
+    X = sample_matrix(1000, 0)
+    merged = app_main.pairwise_moments(X[:1])
+    for start, stop in ((1, 150), (150, 151), (151, 700), (700, 1000)):
+        merged = app_main.merge_moments(merged, app_main.pairwise_moments(X[start:stop]))
+
+    expected = app_main.pairwise_moments(X)
+    for key in app_main.MOMENT_KEYS:
+        np.testing.assert_allclose(merged[key], expected[key], rtol=1e-9, atol=1e-9)
+
+
+def test_merge_moments_with_empty_chunk(app_main):
+    X = sample_matrix(100, 1)
+    merged = app_main.merge_moments(app_main.pairwise_moments(X[:0]), app_main.pairwise_moments(X))
+
+    expected = app_main.pairwise_moments(X)
+    for key in app_main.MOMENT_KEYS:
+        np.testing.assert_allclose(merged[key], expected[key])
+
+
+def test_correlation_matches_pandas(app_main):
+    X = sample_matrix(500, 2)
+    moments = app_main.merge_moments(app_main.pairwise_moments(X[:200]), app_main.pairwise_moments(X[200:]))
+
+    np.testing.assert_allclose(app_main.correlation_from_moments(moments), pd.DataFrame(X).corr().to_numpy(), atol=1e-12)
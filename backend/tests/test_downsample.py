@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def test_lttb_keeps_endpoints_and_one_point_per_bucket(app_main):
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 300.0) + np.random.default_rng(0).normal(scale=0.1, size=len(x))
+    threshold = 500
+
+    keep = app_main.lttb_indices(x, y, threshold)
+
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    edges = np.linspace(1, len(x) - 1, threshold - 1).astype(np.int64)
+    for i, index in enumerate(keep[1:-1]):
+        assert edges[i] <= index < edges[i + 1]
+
+
+def test_lttb_keeps_spikes(app_main):
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[[137, 612]] = [50.0, -50.0]
+
+    keep = app_main.lttb_indices(x, y, 20)
+
+    assert {137, 612} <= set(keep.tolist())
+
+
+def test_lttb_returns_everything_below_threshold(app_main):
+    x = np.arange(10, dtype=np.float64)
+
+    np.testing.assert_array_equal(app_main.lttb_indices(x, x, 10), np.arange(10))
+    np.testing.assert_array_equal(app_main.lttb_indices(x, x, 2), np.arange(10))
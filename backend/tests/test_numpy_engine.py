@@ -0,0 +1,49 @@
+import numpy as np
+import tensorflow as tf
+from sklearn.preprocessing import StandardScaler
+
+import training
+from model_io import NUMPY_ENGINE_TOLERANCE, NumpyDenseModel, export_numpy_artifact
+
+
+def fitted_scaler(n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    return StandardScaler().fit(rng.normal(loc=50.0, scale=10.0, size=(200, n_features)))
+
+
+def test_engine_matches_keras(tmp_path):
+    tf.keras.utils.set_random_seed(0)
+    model = training.build_model(3)  # the generator's 64-32-1 network
+    scaler = fitted_scaler(3)
+    path = tmp_path / "m_numpy.npz"
+
+    assert export_numpy_artifact(model, scaler, path)
+
+    engine = NumpyDenseModel.load(path)
+    assert [w.shape for w in engine.weights] == [(3, 64), (64, 32), (32, 1)]
+    X = np.random.default_rng(1).normal(loc=50.0, scale=10.0, size=(500, 3))
+    expected = model.predict(scaler.transform(X), verbose=0).reshape(-1)
+    np.testing.assert_allclose(engine.predict(X), expected, atol=NUMPY_ENGINE_TOLERANCE, rtol=NUMPY_ENGINE_TOLERANCE)
+
+
+def test_engine_rejects_unsupported_layers(tmp_path):
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(3,)),
+        tf.keras.layers.Dense(8, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(1),
+    ])
+    path = tmp_path / "m_numpy.npz"
+
+    assert not export_numpy_artifact(model, fitted_scaler(3), path)
+    assert not path.exists()
+
+
+def test_engine_rejects_unsupported_activation(tmp_path):
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(3,)),
+        tf.keras.layers.Dense(8, activation="elu"),
+        tf.keras.layers.Dense(1),
+    ])
+
+    assert not export_numpy_artifact(model, fitted_scaler(3), tmp_path / "m_numpy.npz")
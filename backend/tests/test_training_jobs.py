@@ -0,0 +1,41 @@
+import pytest
+
+from training_jobs import AUTOML_MAX_CONFIGS, halving_plan, halving_rungs, parse_search_space
+
+
+def plan_cost(n, rungs, eta):
+    total, previous = 0, 0
+    for k, rung in enumerate(rungs):
+        total += max(n // eta ** k, 1) * (rung - previous)
+        previous = rung
+    return total
+
+
+def test_halving_rungs():
+    # Rungs count down from max_epochs by factors of eta, staying at or above min_epochs
+    assert halving_rungs(5, 100, 3) == [11, 33, 100]
+    assert halving_rungs(10, 10, 3) == [10]
+    assert halving_rungs(1, 27, 3) == [1, 3, 9, 27]
+
+
+@pytest.mark.parametrize("budget", [50, 300, 2000, 10 ** 6])
+def test_halving_plan_fits_budget(budget):
+    rungs = halving_rungs(5, 100, 3)
+    n, total_epochs = halving_plan(budget, rungs, 3)
+
+    assert total_epochs == plan_cost(n, rungs, 3)
+    assert 1 <= n <= AUTOML_MAX_CONFIGS
+    if n > 1:
+        assert total_epochs <= budget
+    # Largest plan that fits: one more config would exceed the budget or the config cap
+    assert n == AUTOML_MAX_CONFIGS or plan_cost(n + 1, rungs, 3) > budget
+
+
+def test_parse_search_space():
+    space = parse_search_space('{"width": [8, 16], "max_epochs": 20}')
+    assert space["width"] == [8, 16]
+    assert space["max_epochs"] == 20
+    with pytest.raises(ValueError):
+        parse_search_space('{"optimizer": ["sgd"]}')
+    with pytest.raises(ValueError):
+        parse_search_space('{"learning_rate": [0.1, 0.01]}')
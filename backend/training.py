@@ -0,0 +1,143 @@
+# Models, input pipeline and stopping policy shared by every training path (train jobs, AutoML,
+# cross-validation folds). Free of the app imports so cv_worker processes can use it too.
+import time
+
+import numpy as np
+import tensorflow as tf
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+DEFAULT_TRAINING_OPTIONS = {
+    "batch_size": 16,
+    "learning_rate": 0.001,
+    "early_stopping_patience": 0,  # epochs without val_loss improvement before stopping (0 = off)
+    "reduce_lr_patience": 0,       # epochs without improvement before halving the learning rate (0 = off)
+    "min_delta": 0.0,
+}
+VALIDATION_FRACTION = 0.1  # slice of the training data watched by the early-stopping/plateau policy
+
+# Model families besides the Keras MLP ("ann"). They train on the same scaled inputs and are
+# saved next to the usual scaler as <model>.joblib instead of <model>.h5.
+SKLEARN_FAMILIES = {
+    "linear": (LinearRegression, {}),
+    "random_forest": (RandomForestRegressor, {"n_estimators": 100, "random_state": 42}),
+    "gradient_boosting": (GradientBoostingRegressor, {"n_estimators": 100, "learning_rate": 0.1, "random_state": 42}),
+    "hist_gradient_boosting": (HistGradientBoostingRegressor, {"random_state": 42}),
+}
+MODEL_FAMILIES = ("ann",) + tuple(SKLEARN_FAMILIES)
+
+
+def parse_training_options(batch_size=None, learning_rate=None, early_stopping_patience=None,
+                           reduce_lr_patience=None, min_delta=None):
+    # Form fields -> options dict (None keeps the default); raises ValueError on bad values
+    given = {
+        "batch_size": batch_size,
+        "learning_rate": learning_rate,
+        "early_stopping_patience": early_stopping_patience,
+        "reduce_lr_patience": reduce_lr_patience,
+        "min_delta": min_delta,
+    }
+    options = dict(DEFAULT_TRAINING_OPTIONS)
+    options.update({key: value for key, value in given.items() if value is not None})
+
+    if options["batch_size"] < 1:
+        raise ValueError("batch_size must be at least 1.")
+    if options["learning_rate"] <= 0:
+        raise ValueError("learning_rate must be positive.")
+    if options["early_stopping_patience"] < 0 or options["reduce_lr_patience"] < 0 or options["min_delta"] < 0:
+        raise ValueError("Patience and min_delta cannot be negative.")
+    return options
+
+
+def build_model(n_inputs, learning_rate=0.001, layers=(64, 32)):
+    model = tf.keras.Sequential(
+        [tf.keras.layers.Input(shape=(n_inputs,))]
+        + [tf.keras.layers.Dense(width, activation='relu') for width in layers]
+        + [tf.keras.layers.Dense(1)]
+    )
+    return compile_model(model, learning_rate)
+
+
+def compile_model(model, learning_rate=0.001):
+    # Also used to resume training of a saved model (saved without its optimizer)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss='mse', metrics=['mae', 'mse'])
+    return model
+
+
+def build_estimator(family, params=None, n_jobs=-1):
+    # Raises KeyError for unknown families and ValueError for unknown params
+    cls, defaults = SKLEARN_FAMILIES[family]
+    estimator = cls(**defaults)
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+    if params:
+        estimator.set_params(**params)
+    return estimator
+
+
+def parse_model_params(family, params=None):
+    # Validates a family and its estimator params; raises ValueError
+    if family not in MODEL_FAMILIES:
+        raise ValueError(f"model_family must be one of: {', '.join(MODEL_FAMILIES)}.")
+    if not params:
+        return {}
+    if family == "ann":
+        raise ValueError("model_params only apply to scikit-learn families.")
+    build_estimator(family, params)  # set_params rejects unknown names
+    return params
+
+
+def predict(model, X):
+    # Flat predictions from either a Keras model or a fitted estimator
+    if isinstance(model, tf.keras.Model):
+        return model.predict(X, verbose=0).reshape(-1)
+    return np.asarray(model.predict(X)).reshape(-1)
+
+
+def make_dataset(X, y, batch_size, shuffle=False, seed=42):
+    # float32 once up front, reshuffled every epoch, and the next batches prepared while the
+    # current one trains
+    dataset = tf.data.Dataset.from_tensor_slices((np.asarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32)))
+    if shuffle:
+        dataset = dataset.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def fit_model(model, X, y, options, epochs, callbacks=(), initial_epoch=0):
+    # Returns (history, epochs_run, wall_time_s). With a stopping policy a validation slice of
+    # (X, y) is held out and the weights of the best epoch are restored at the end.
+    callbacks = list(callbacks)
+    validation = None
+    if options["early_stopping_patience"] or options["reduce_lr_patience"]:
+        order = np.random.default_rng(42).permutation(len(X))
+        cut = len(X) - max(int(len(X) * VALIDATION_FRACTION), 1)
+        X, X_val = X[order[:cut]], X[order[cut:]]
+        y, y_val = y[order[:cut]], y[order[cut:]]
+        validation = make_dataset(X_val, y_val, options["batch_size"])
+        if options["reduce_lr_patience"]:
+            callbacks.append(tf.keras.callbacks.ReduceLROnPlateau(
+                monitor="val_loss", factor=0.5, patience=options["reduce_lr_patience"], min_delta=options["min_delta"]))
+        if options["early_stopping_patience"]:
+            callbacks.append(tf.keras.callbacks.EarlyStopping(
+                monitor="val_loss", patience=options["early_stopping_patience"], min_delta=options["min_delta"],
+                restore_best_weights=True))
+
+    started = time.perf_counter()
+    history = model.fit(
+        make_dataset(X, y, options["batch_size"], shuffle=True),
+        validation_data=validation,
+        initial_epoch=initial_epoch,
+        epochs=epochs,
+        shuffle=False,  # the dataset reshuffles itself
+        verbose=0,
+        callbacks=callbacks
+    )
+    return history, initial_epoch + len(history.epoch), time.perf_counter() - started
+
+
+def fit_estimator(estimator, X, y):
+    # Returns (training MSE, wall_time_s)
+    started = time.perf_counter()
+    estimator.fit(X, y)
+    wall_time = time.perf_counter() - started
+    return float(np.mean(np.square(predict(estimator, X) - y))), wall_time
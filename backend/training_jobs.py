@@ -0,0 +1,765 @@
+# Training, fine-tuning and AutoML jobs, run inside the training scheduler's worker processes.
+# Kept free of the app imports so spawned workers only load the training stack; results, progress
+# and AutoML candidates go back to the scheduler over the worker's pipe.
+import io
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import joblib
+import numpy as np
+import tensorflow as tf
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+import cv_worker
+import training
+from dataset_cache import DATASETS_FOLDER, read_dataset
+from model_io import MODEL_FOLDER, SUMMARY_FOLDER, model_file, save_model_file
+
+# Read in the worker processes, which inherit the API process environment (.env included)
+TRAINING_THREADS = int(os.getenv("TRAINING_THREADS", "0"))
+TRAINING_NICE = int(os.getenv("TRAINING_NICE", "10"))
+CV_MAX_FOLDS = 10
+
+# Where save_automl_candidate hands candidates over; the worker loop points it at its pipe
+candidate_sink = None
+
+
+def pack_candidate(model, scaler, summary):
+    # Keras models travel as architecture + weights, estimators as joblib bytes
+    entry = {"scaler": scaler, "summary": summary}
+    if isinstance(model, tf.keras.Model):
+        entry["config"] = model.to_json()
+        entry["weights"] = model.get_weights()
+    else:
+        buf = io.BytesIO()
+        joblib.dump(model, buf)
+        entry["estimator"] = buf.getvalue()
+    return entry
+
+
+def unpack_candidate(entry):
+    if "estimator" in entry:
+        return joblib.load(io.BytesIO(entry["estimator"])), entry["scaler"]
+    model = tf.keras.models.model_from_json(entry["config"])
+    model.set_weights(entry["weights"])
+    return model, entry["scaler"]
+
+
+def candidate_nbytes(entry):
+    if "estimator" in entry:
+        return len(entry["estimator"])
+    return len(entry["config"]) + sum(w.nbytes for w in entry["weights"])
+
+
+def cross_validate(X, y, cv_folds, milestones, options, on_progress=None, family="ann", model_params=None):
+    # k-fold CV with every fold in its own spawned process. Folds share one .npy copy of [X | y]
+    # and their scaler stats come from a single pass (cv_worker.fold_scalers). Returns
+    # {epochs: {"folds": [...], "mean": {...}, "std": {...}}} for each requested milestone.
+    from multiprocessing.connection import wait
+
+    folds = [test_idx for _, test_idx in KFold(n_splits=cv_folds, shuffle=True, random_state=42).split(X)]
+    scalers = cv_worker.fold_scalers(X, folds)
+    max_epochs = max(milestones)
+    threads = TRAINING_THREADS or max((os.cpu_count() or 1) // cv_folds, 1)
+    ctx = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp, "data.npy")
+        np.save(data_path, np.column_stack([X, y]).astype(np.float64))
+
+        running = {}
+        for i, (test_idx, (mean, scale)) in enumerate(zip(folds, scalers)):
+            reader, writer = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=cv_worker.run_fold,
+                args=(writer, str(data_path), test_idx, mean, scale, milestones, options, threads, family, model_params),
+                daemon=True,
+            )
+            process.start()
+            writer.close()
+            running[reader] = (i, process)
+
+        processes = [process for _, process in running.values()]
+        epochs_done = [0] * cv_folds
+        results = [None] * cv_folds
+        try:
+            while running:
+                for conn in wait(list(running)):
+                    i, _ = running[conn]
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        raise RuntimeError(f"Cross-validation fold {i + 1} exited unexpectedly")
+                    if message[0] == "progress":
+                        epochs_done[i] = message[1]
+                        if on_progress:
+                            on_progress(i, message[1], message[2], sum(epochs_done) / (cv_folds * max_epochs))
+                    elif message[0] == "done":
+                        results[i] = message[1]
+                        del running[conn]
+                        conn.close()
+                    else:
+                        raise RuntimeError(f"Cross-validation fold {i + 1} failed: {message[1]}")
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.kill()
+                process.join()
+
+    summary = {}
+    for epochs in milestones:
+        fold_metrics = [dict(fold[epochs], fold=i + 1) for i, fold in enumerate(results)]
+        stats = {"mean": {}, "std": {}}
+        for key in ("train_loss", "mse", "mae", "r2", "epochs_run"):
+            values = [fold[key] for fold in fold_metrics]
+            finite = None not in values
+            stats["mean"][key] = float(np.mean(values)) if finite else None
+            stats["std"][key] = float(np.std(values)) if finite else None
+        summary[epochs] = {"folds": fold_metrics, **stats}
+    return summary
+
+
+def cv_summary(cv, cv_folds):
+    # Cross-validation block stored in model summaries
+    return {"folds": cv_folds, "mean": cv["mean"], "std": cv["std"], "fold_metrics": cv["folds"]}
+
+
+def run_train_job(report, model_name: str, features: list, epochs: int, test_size: float, cv_folds: int = 0, training_options: dict = None,
+                  model_family: str = "ann", model_params: dict = None):
+    file_location = os.path.abspath(Path(DATASETS_FOLDER, f"{model_name}.csv"))
+    if not Path(file_location).exists():
+        raise FileNotFoundError(f"Dataset not found: {file_location}")
+
+    df = read_dataset(file_location, features + ['pue'])
+    X = df[features].values
+    y = df['pue'].values
+    options = training_options or training.DEFAULT_TRAINING_OPTIONS
+
+    cv = None
+    if cv_folds:
+        # Metrics come from k folds in parallel; the final model is then refit on all the data
+        def on_fold_progress(fold, epoch, logs, fraction):
+            report({
+                "fold": fold + 1,
+                "total_folds": cv_folds,
+                "epoch": epoch,
+                "total_epochs": epochs,
+                "loss": logs["loss"],
+                "mae": logs.get("mae", 0.0),
+                "mse": logs.get("mse", 0.0)
+            }, fraction / 2)
+
+        cv = cross_validate(X, y, cv_folds, [epochs], options, on_fold_progress, model_family, model_params)[epochs]
+        X_train, y_train = X, y
+    else:
+        # First split
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size / 100, random_state=42
+        )
+
+    # Then scalar using X_train
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+
+    def on_epoch_end(epoch, logs):
+        fraction = (epoch + 1) / epochs
+        report({
+            "epoch": epoch + 1,
+            "total_epochs": epochs,
+            "loss": float(logs["loss"]),
+            "mae": float(logs.get("mae", 0.0)),
+            "mse": float(logs.get("mse", 0.0))
+        }, 0.5 + fraction / 2 if cv_folds else fraction)
+
+    if model_family == "ann":
+        model = training.build_model(X.shape[1], options["learning_rate"])
+        history, epochs_run, wall_time = training.fit_model(
+            model, X_train, y_train, options, epochs,
+            callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
+        )
+        loss = history.history['loss'][-1]
+    else:
+        # One fit on all cores; reported as a single "epoch" so progress consumers keep working
+        model = training.build_estimator(model_family, model_params)
+        loss, wall_time = training.fit_estimator(model, X_train, y_train)
+        epochs, epochs_run = 1, None
+        on_epoch_end(0, {"loss": loss, "mse": loss})
+
+    save_model_file(model, scaler, MODEL_FOLDER, model_name, Path(MODEL_FOLDER, f'{model_name}_numpy.npz'))
+    joblib.dump(scaler, Path(MODEL_FOLDER, f'{model_name}_scaler.gz'))
+
+    if cv_folds:
+        mae, r2 = cv["mean"]["mae"], cv["mean"]["r2"]
+        test_size = round(100 / cv_folds, 2)
+    else:
+        y_pred = training.predict(model, scaler.transform(X_test))
+        mae = mean_absolute_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+
+    summary = {
+        "model_name": model_name,
+        "features": features,
+        "model_family": model_family,
+        "epochs": epochs if model_family == "ann" else None,
+        "epochs_run": epochs_run,
+        "wall_time_s": round(wall_time, 3),
+        "test_size": test_size,
+        "dataset_rows": len(df),
+        "metrics": {
+            "loss": float(loss),
+            "mae": float(mae),
+            "r2": float(r2)
+        }
+    }
+    if model_family == "ann":
+        summary["training"] = options
+    else:
+        summary["model_params"] = model_params or {}
+    if cv_folds:
+        summary["cross_validation"] = cv_summary(cv, cv_folds)
+
+    SUMMARY_FOLDER.mkdir(parents=True, exist_ok=True)
+    summary_path = Path(SUMMARY_FOLDER, f"{model_name}.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    result = {"loss": float(loss), "mae": float(mae), "r2": float(r2), "epochs_run": epochs_run, "wall_time_s": round(wall_time, 3)}
+    if cv_folds:
+        result["cv_std"] = {"mae": cv["std"]["mae"], "r2": cv["std"]["r2"]}
+    return result
+
+
+# Fine-tuning continues training a saved model on the rows appended to its dataset since it was
+# trained. The replaced version is archived under models/versions/<model>/v<N> (the last
+# MODEL_VERSIONS_KEEP are kept).
+MODEL_VERSIONS_FOLDER = MODEL_FOLDER / "versions"
+MODEL_VERSIONS_KEEP = int(os.getenv("MODEL_VERSIONS_KEEP", "5"))
+
+
+def archive_model_version(model_name, version):
+    folder = MODEL_VERSIONS_FOLDER / model_name / f"v{version}"
+    # A full retrain starts counting again, so the number may already be taken
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True)
+    for path in (model_file(MODEL_FOLDER, model_name), Path(MODEL_FOLDER, f"{model_name}_scaler.gz"),
+                 Path(MODEL_FOLDER, f"{model_name}_numpy.npz"), Path(SUMMARY_FOLDER, f"{model_name}.json")):
+        if path.exists():
+            shutil.copy(path, folder / path.name)
+    archived = sorted(MODEL_VERSIONS_FOLDER.joinpath(model_name).glob("v*"), key=lambda p: int(p.name[1:]))
+    for stale in archived[:-MODEL_VERSIONS_KEEP] if MODEL_VERSIONS_KEEP > 0 else archived:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def run_finetune_job(report, model_name: str, epochs: int, test_size: float, window_rows: int = None,
+                     refit_scaler: bool = False, only_if_better: bool = False, training_options: dict = None):
+    summary_path = Path(SUMMARY_FOLDER, f"{model_name}.json")
+    model_path = model_file(MODEL_FOLDER, model_name)
+    if not summary_path.exists() or not model_path.exists():
+        raise FileNotFoundError(f"Model not trained yet: {model_name}")
+    with open(summary_path) as f:
+        previous = json.load(f)
+    if previous.get("model_family", "ann") != "ann" or model_path.suffix != ".h5":
+        raise ValueError("Only ann models can be fine-tuned; retrain the others with /train_model.")
+
+    file_location = Path(DATASETS_FOLDER, f"{model_name}.csv")
+    if not file_location.exists():
+        raise FileNotFoundError(f"Dataset not found: {file_location}")
+    features = previous["features"]
+    df = read_dataset(file_location, features + ['pue'])
+    total_rows = len(df)
+    if window_rows:
+        start = max(total_rows - window_rows, 0)
+    else:
+        start = previous.get("dataset_rows")
+        if start is None or start >= total_rows:
+            raise ValueError("No rows appended since the last training; set window_rows to fine-tune on the most recent rows.")
+    X = df[features].values[start:]
+    y = df['pue'].values[start:]
+    if len(X) < 2:
+        raise ValueError("Not enough rows to fine-tune on.")
+    options = training_options or training.DEFAULT_TRAINING_OPTIONS
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size / 100, random_state=42)
+
+    scaler = joblib.load(Path(MODEL_FOLDER, f"{model_name}_scaler.gz"))
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    def evaluate():
+        y_pred = training.predict(model, scaler.transform(X_test))
+        return {
+            "mse": float(mean_squared_error(y_test, y_pred)),
+            "mae": float(mean_absolute_error(y_test, y_pred)),
+            "r2": float(r2_score(y_test, y_pred)),
+        }
+
+    # Both versions are scored on the same held-out rows of the window
+    before = evaluate()
+    if refit_scaler:
+        scaler.partial_fit(X_train)
+    training.compile_model(model, options["learning_rate"])
+
+    def on_epoch_end(epoch, logs):
+        report({
+            "epoch": epoch + 1,
+            "total_epochs": epochs,
+            "loss": float(logs["loss"]),
+            "mae": float(logs.get("mae", 0.0)),
+            "mse": float(logs.get("mse", 0.0))
+        }, (epoch + 1) / epochs)
+
+    history, epochs_run, wall_time = training.fit_model(
+        model, scaler.transform(X_train), y_train, options, epochs,
+        callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
+    )
+    loss = history.history['loss'][-1]
+    after = evaluate()
+
+    version = previous.get("version", 1)
+    comparison = {
+        "previous_version": version,
+        "evaluation_rows": len(X_test),
+        "previous": before,
+        "new": after,
+        "delta": {key: after[key] - before[key] for key in after},
+        "improved": after["mse"] <= before["mse"],
+    }
+    result = {"promoted": True, "version": version + 1, "loss": float(loss), "mae": after["mae"], "r2": after["r2"],
+              "epochs_run": epochs_run, "wall_time_s": round(wall_time, 3), "comparison": comparison}
+    if only_if_better and not comparison["improved"]:
+        result.update({"promoted": False, "version": version})
+        return result
+
+    archive_model_version(model_name, version)
+    save_model_file(model, scaler, MODEL_FOLDER, model_name, Path(MODEL_FOLDER, f'{model_name}_numpy.npz'))
+    joblib.dump(scaler, Path(MODEL_FOLDER, f'{model_name}_scaler.gz'))
+
+    summary = dict(previous)
+    summary.update({
+        "version": version + 1,
+        "versions": previous.get("versions", []) + [{"version": version, "metrics": previous["metrics"]}],
+        "epochs_run": epochs_run,
+        "wall_time_s": round(wall_time, 3),
+        "test_size": test_size,
+        "dataset_rows": total_rows,
+        "metrics": {
+            "loss": float(loss),
+            "mae": after["mae"],
+            "r2": after["r2"]
+        },
+        "training": options,
+        "fine_tune": {
+            "epochs": epochs,
+            "rows": [start, total_rows],
+            "refit_scaler": refit_scaler,
+            "comparison": comparison,
+        },
+    })
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return result
+
+
+def save_automl_candidate(model, scaler, summary):
+    # Candidates live in automl_candidates until /save_automl_model promotes one
+    temp_id = str(uuid.uuid4())
+    candidate_sink(temp_id, pack_candidate(model, scaler, summary))
+    return temp_id
+
+
+def run_automl_job(report, model_name: str, features: list, epochs_options: list, test_size_options: list, loss_metric: str = "test",
+                   share_epochs: bool = True, cv_folds: int = 0, training_options: dict = None, model_families: list = None):
+    file_location = Path(DATASETS_FOLDER) / f"{model_name}.csv"
+    if not file_location.exists():
+        raise FileNotFoundError(f"Dataset not found: {file_location}")
+
+    df = read_dataset(file_location, features + ['pue'])
+    X = df[features].values
+    y = df['pue'].values
+    options = training_options or training.DEFAULT_TRAINING_OPTIONS
+    families = model_families or ["ann"]
+    estimators = [family for family in families if family != "ann"]
+    epochs_options = epochs_options if "ann" in families else []
+
+    # With share_epochs each split trains a single model up to the largest epoch count and
+    # snapshots a candidate at every requested milestone instead of retraining from scratch
+    if not epochs_options:
+        runs = []
+    elif share_epochs or cv_folds:
+        runs = [sorted(epochs_options)]
+    else:
+        runs = [[epochs] for epochs in epochs_options]
+    if cv_folds:
+        test_size_options = [round(100 / cv_folds, 2)]
+    total_models = (len(epochs_options) + len(estimators)) * len(test_size_options)
+    # A scikit-learn fit counts as one epoch of work for progress purposes
+    total_epochs = len(test_size_options) * (sum(milestones[-1] for milestones in runs) + len(estimators))
+
+    cv = {}
+    cv_share = 0.0
+    if cv_folds:
+        # Candidates are scored by k-fold CV (folds run in parallel, each trained once up to the
+        # largest epoch count) and saved as snapshots of a single refit on all the data
+        def on_fold_progress(fold, epoch, logs, fraction):
+            report({
+                "fold": fold + 1,
+                "total_folds": cv_folds,
+                "model_idx": 1,
+                "total_models": total_models,
+                "epoch": epoch,
+                "total_epochs": runs[0][-1],
+                "loss": logs["loss"],
+                "mae": logs.get("mae", 0.0),
+                "mse": logs.get("mse", 0.0)
+            }, fraction / 2)
+
+        if runs:
+            cv["ann"] = cross_validate(X, y, cv_folds, runs[0], options, on_fold_progress)
+        for family in estimators:
+            cv[family] = cross_validate(X, y, cv_folds, [1], options, family=family)
+        cv_share = 0.5
+
+    model_counter = 0
+    epochs_done = 0
+    candidates = []
+    held_out_mse = {}
+
+    for test_size in test_size_options:
+        if cv_folds:
+            X_train, y_train = X, y
+        else:
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size / 100, random_state=42
+            )
+
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+
+        def save_candidate(model, family, epochs, train_loss, fraction, epochs_run, wall_time):
+            nonlocal model_counter
+            model_counter += 1
+
+            if cv_folds:
+                scores = cv[family][epochs if family == "ann" else 1]
+                mse, mae, r2 = scores["mean"]["mse"], scores["mean"]["mae"], scores["mean"]["r2"]
+            else:
+                y_pred = training.predict(model, scaler.transform(X_test))
+                mse = mean_squared_error(y_test, y_pred)
+                mae = mean_absolute_error(y_test, y_pred)
+                r2 = r2_score(y_test, y_pred)
+            loss = mse if loss_metric == "test" else train_loss
+
+            summary = {
+                "model_name": model_name,
+                "features": features,
+                "model_family": family,
+                "epochs": epochs,
+                "epochs_run": epochs_run,
+                "wall_time_s": round(wall_time, 3),
+                "test_size": test_size,
+                "dataset_rows": len(df),
+                "metrics": {
+                    "loss": float(loss),
+                    "mae": float(mae),
+                    "r2": float(r2)
+                }
+            }
+            if family == "ann":
+                summary["training"] = options
+            else:
+                summary["model_params"] = {}
+            if cv_folds:
+                summary["cross_validation"] = cv_summary(scores, cv_folds)
+            temp_id = save_automl_candidate(model, scaler, summary)
+            held_out_mse[temp_id] = float(mse)
+
+            candidate = {
+                "model_idx": model_counter,
+                "total_models": total_models,
+                "model_family": family,
+                "epochs": epochs,
+                "epochs_run": epochs_run,
+                "wall_time_s": round(wall_time, 3),
+                "test_size": test_size,
+                "loss": round(float(loss), 6),
+                "mae": round(float(mae), 6),
+                "r2": round(float(r2), 6),
+                "temp_id": temp_id,
+                "is_summary": True  # clave para distinguir
+            }
+            if cv_folds:
+                candidate["cv_folds"] = cv_folds
+                candidate["cv_std"] = {key: scores["std"][key] for key in ("mse", "mae", "r2")}
+            candidates.append(candidate)
+            report(candidate, fraction)
+
+        for milestones in runs:
+            max_epochs = milestones[-1]
+            pending = list(milestones)
+
+            model = training.build_model(X.shape[1], options["learning_rate"])
+            started = time.perf_counter()
+
+            def on_epoch_end(epoch, logs):
+                fraction = cv_share + (1 - cv_share) * (epochs_done + epoch + 1) / total_epochs
+                report({
+                    "model_idx": model_counter + 1,
+                    "total_models": total_models,
+                    "epoch": epoch + 1,
+                    "total_epochs": max_epochs,
+                    "loss": float(logs["loss"]),
+                    "mae": float(logs.get("mae", 0.0)),
+                    "mse": float(logs.get("mse", 0.0)),
+                    "test_size": test_size
+                }, fraction)
+                # Duplicated epoch options each get their own candidate
+                while pending and pending[0] == epoch + 1:
+                    save_candidate(model, "ann", pending.pop(0), float(logs["loss"]), fraction, epoch + 1, time.perf_counter() - started)
+
+            history, epochs_run, wall_time = training.fit_model(
+                model, X_train, y_train, options, max_epochs,
+                callbacks=[tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)]
+            )
+            epochs_done += max_epochs
+            # Epoch options past an early stop become snapshots of the restored best weights
+            while pending:
+                save_candidate(model, "ann", pending.pop(0), float(history.history["loss"][-1]),
+                               cv_share + (1 - cv_share) * epochs_done / total_epochs, epochs_run, wall_time)
+
+        for family in estimators:
+            model = training.build_estimator(family)
+            train_loss, wall_time = training.fit_estimator(model, X_train, y_train)
+            epochs_done += 1
+            save_candidate(model, family, None, train_loss, cv_share + (1 - cv_share) * epochs_done / total_epochs, None, wall_time)
+
+    # Families are compared on held-out error even when loss_metric reports the training loss
+    ranking = sorted(held_out_mse, key=held_out_mse.get)
+    return {"candidates": candidates, "ranking": ranking}
+
+# Adaptive AutoML: successive halving over architecture, learning rate and batch size, with
+# epochs as the resource. All sampled configs get min_epochs, then only the best 1/eta of them
+# (by validation MSE) keep training up to the next rung, until max_epochs.
+AUTOML_SEARCH_SPACE = {
+    "depth": [1, 2, 3],
+    "width": [16, 32, 64, 128],
+    "learning_rate": [0.0003, 0.003],  # log-uniform bounds
+    "batch_size": [16, 32, 64],
+    "min_epochs": 5,
+    "max_epochs": 100,
+}
+AUTOML_SEARCH_BUDGET = 2000  # total epochs across all configs
+AUTOML_MAX_CONFIGS = 81
+AUTOML_VALIDATION_FRACTION = 0.2
+
+
+def parse_search_space(text):
+    space = dict(AUTOML_SEARCH_SPACE)
+    if text:
+        overrides = json.loads(text)
+        unknown = set(overrides) - set(space)
+        if unknown:
+            raise ValueError(f"Unknown search space keys: {sorted(unknown)}")
+        space.update(overrides)
+
+    for key in ("depth", "width", "batch_size"):
+        if not space[key] or any(int(v) < 1 for v in space[key]):
+            raise ValueError(f"'{key}' must be a non-empty list of positive integers.")
+    low, high = space["learning_rate"]
+    if not 0 < low <= high:
+        raise ValueError("'learning_rate' must be [low, high] with 0 < low <= high.")
+    if not 1 <= space["min_epochs"] <= space["max_epochs"]:
+        raise ValueError("Epochs must satisfy 1 <= min_epochs <= max_epochs.")
+    return space
+
+
+def halving_rungs(min_epochs, max_epochs, eta):
+    s = int(math.floor(math.log(max_epochs / min_epochs, eta) + 1e-9))
+    rungs = [max(int(round(max_epochs / eta ** (s - k))), 1) for k in range(s + 1)]
+    return sorted(set(rungs))
+
+
+def halving_plan(budget, rungs, eta):
+    # Largest number of starting configs whose schedule fits in the epoch budget; survivors resume
+    # training, so each rung only costs the epochs between it and the previous one
+    def cost(n):
+        total, previous = 0, 0
+        for k, rung in enumerate(rungs):
+            total += max(n // eta ** k, 1) * (rung - previous)
+            previous = rung
+        return total
+
+    n = 1
+    while n < AUTOML_MAX_CONFIGS and cost(n + 1) <= budget:
+        n += 1
+    return n, cost(n)
+
+
+def sample_search_config(rng, space):
+    depth = int(rng.choice(space["depth"]))
+    return {
+        "layers": sorted((int(w) for w in rng.choice(space["width"], size=depth)), reverse=True),
+        "learning_rate": float(np.exp(rng.uniform(*np.log(space["learning_rate"])))),
+        "batch_size": int(rng.choice(space["batch_size"])),
+    }
+
+
+def run_automl_search_job(report, model_name: str, features: list, test_size: float, search_space: dict,
+                          budget: int, eta: int = 3, seed: int = None, loss_metric: str = "test"):
+    file_location = Path(DATASETS_FOLDER) / f"{model_name}.csv"
+    if not file_location.exists():
+        raise FileNotFoundError(f"Dataset not found: {file_location}")
+
+    df = read_dataset(file_location, features + ['pue'])
+    X = df[features].values
+    y = df['pue'].values
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size / 100, random_state=42
+    )
+    # Configs are ranked on a slice of the training data so the test split stays unseen
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=AUTOML_VALIDATION_FRACTION, random_state=42
+    )
+
+    scaler = StandardScaler()
+    X_fit = scaler.fit_transform(X_fit)
+    X_val = scaler.transform(X_val)
+    X_test = scaler.transform(X_test)
+
+    rungs = halving_rungs(search_space["min_epochs"], search_space["max_epochs"], eta)
+    total_models, total_epochs = halving_plan(budget, rungs, eta)
+    rng = np.random.default_rng(seed)
+
+    model_counter = 0
+    epochs_done = 0
+    candidates = []
+
+    def save_candidate(trial):
+        nonlocal model_counter
+        model_counter += 1
+        model = trial["model"]
+
+        y_pred = model.predict(X_test, verbose=0).flatten()
+        candidate = {
+            "model_idx": model_counter,
+            "total_models": total_models,
+            "epochs": trial["epochs"],
+            "test_size": test_size,
+            "hyperparameters": trial["config"],
+            "val_loss": round(trial["val_loss"], 6) if np.isfinite(trial["val_loss"]) else None,
+            "is_summary": True
+        }
+        if np.all(np.isfinite(y_pred)):
+            loss = mean_squared_error(y_test, y_pred) if loss_metric == "test" else trial["train_loss"]
+            mae = mean_absolute_error(y_test, y_pred)
+            r2 = r2_score(y_test, y_pred)
+            candidate.update({
+                "loss": round(float(loss), 6),
+                "mae": round(float(mae), 6),
+                "r2": round(float(r2), 6),
+                "temp_id": save_automl_candidate(model, scaler, {
+                    "model_name": model_name,
+                    "features": features,
+                    "model_family": "ann",
+                    "epochs": trial["epochs"],
+                    "test_size": test_size,
+                    "dataset_rows": len(df),
+                    "hyperparameters": trial["config"],
+                    "metrics": {
+                        "loss": float(loss),
+                        "mae": float(mae),
+                        "r2": float(r2)
+                    }
+                }),
+            })
+        else:
+            # Diverged: reported, but there is nothing worth saving
+            candidate.update({"loss": None, "mae": None, "r2": None, "temp_id": None})
+        candidates.append(candidate)
+        report(candidate, epochs_done / total_epochs)
+
+    trials = []
+    for _ in range(total_models):
+        config = sample_search_config(rng, search_space)
+        model = training.build_model(X.shape[1], config["learning_rate"], config["layers"])
+        trials.append({"idx": len(trials) + 1, "config": config, "model": model, "epochs": 0})
+
+    for k, rung in enumerate(rungs):
+        for trial in trials:
+            start = trial["epochs"]
+
+            def on_epoch_end(epoch, logs):
+                report({
+                    "model_idx": trial["idx"],
+                    "total_models": total_models,
+                    "epoch": epoch + 1,
+                    "total_epochs": rung,
+                    "loss": float(logs["loss"]),
+                    "mae": float(logs.get("mae", 0.0)),
+                    "mse": float(logs.get("mse", 0.0)),
+                    "test_size": test_size,
+                    "rung": k + 1,
+                    "total_rungs": len(rungs),
+                    "hyperparameters": trial["config"]
+                }, (epochs_done + epoch + 1 - start) / total_epochs)
+
+            history, _, _ = training.fit_model(
+                trial["model"], X_fit, y_fit, dict(training.DEFAULT_TRAINING_OPTIONS, **trial["config"]), rung,
+                callbacks=[
+                    tf.keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end),
+                    tf.keras.callbacks.TerminateOnNaN()
+                ],
+                initial_epoch=start
+            )
+            epochs_done += rung - start
+            trial["epochs"] = rung
+            trial["train_loss"] = float(history.history['loss'][-1])
+            val_pred = trial["model"].predict(X_val, verbose=0).flatten()
+            trial["val_loss"] = float(mean_squared_error(y_val, val_pred)) if np.all(np.isfinite(val_pred)) else float("inf")
+
+        trials.sort(key=lambda trial: trial["val_loss"])
+        keep = max(total_models // eta ** (k + 1), 1) if k + 1 < len(rungs) else 0
+        # Stopped configs are still candidates, reported worst first so the best survivor comes last
+        for trial in reversed(trials[keep:]):
+            save_candidate(trial)
+        trials = trials[:keep]
+
+    return {"candidates": candidates, "rungs": rungs}
+
+
+TRAINING_JOB_RUNNERS = {"train": run_train_job, "automl": run_automl_job, "automl_search": run_automl_search_job,
+                        "finetune": run_finetune_job}
+
+
+def training_worker_main(conn):
+    # Entry point of a worker process
+    global candidate_sink
+    if TRAINING_NICE and hasattr(os, "nice"):
+        os.nice(TRAINING_NICE)
+    if TRAINING_THREADS:
+        tf.config.threading.set_intra_op_parallelism_threads(TRAINING_THREADS)
+        tf.config.threading.set_inter_op_parallelism_threads(TRAINING_THREADS)
+    conn.send(("ready", None, None, None))
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            return
+        if item is None:
+            return
+        job_id, kind, params = item
+        report = lambda payload, fraction=None: conn.send((job_id, "progress", payload, fraction))
+        candidate_sink = lambda temp_id, entry: conn.send((job_id, "candidate", (temp_id, entry), None))
+        try:
+            result = TRAINING_JOB_RUNNERS[kind](report, **params)
+            conn.send((job_id, "completed", result, 1.0))
+        except Exception as e:
+            conn.send((job_id, "failed", str(e), None))